@@ -0,0 +1,104 @@
+# anki_import.py
+# Imports Anki collections (.anki2) and deck packages (.apkg/.colpkg) straight into the Powerlang database.
+
+import os
+import re
+import json
+import html
+import zipfile
+from datetime import date
+import database
+
+BATCH_SIZE = 10000 # Notes scanned per INSERT ... SELECT, between progress reports
+ANKI_FIELD_SEPARATOR = '\x1f'
+
+_tag_re = re.compile(r'<[^>]*>')
+_sound_re = re.compile(r'\[sound:[^\]]*\]')
+
+def _field(flds, index):
+    """SQL function: returns field `index` of an Anki note's flds, as plain text."""
+    fields = (flds or '').split(ANKI_FIELD_SEPARATOR)
+    if index >= len(fields): return ''
+    text = _sound_re.sub('', fields[index]).replace('<br>', ' ').replace('<br/>', ' ').replace('<br />', ' ')
+    return ' '.join(html.unescape(_tag_re.sub('', text)).split())
+
+def _read_collection(filepath):
+    """Returns the raw bytes of the collection database inside an .apkg/.colpkg file."""
+    with zipfile.ZipFile(filepath, 'r') as zf:
+        names = set(zf.namelist())
+        if 'collection.anki21' in names: return zf.read('collection.anki21')
+        # Newer exports compress the real collection with zstd and only ship a placeholder collection.anki2.
+        if 'collection.anki21b' in names: raise ValueError("This deck was exported in the newest Anki format. Please export it again from Anki with \"Support older Anki versions\" enabled.")
+        if 'collection.anki2' in names: return zf.read('collection.anki2')
+    raise ValueError("No Anki collection found in this file.")
+
+def _anki_decks(cursor):
+    """Returns [(deck_id, name)] for both the old (JSON in col.decks) and new (decks table) schemas."""
+    cursor.execute("SELECT name FROM anki.sqlite_master WHERE type='table' AND name='decks'")
+    if cursor.fetchone() is not None:
+        cursor.execute("SELECT id, name FROM anki.decks")
+        return [(deck_id, name.replace(ANKI_FIELD_SEPARATOR, '::')) for deck_id, name in cursor.fetchall()]
+    cursor.execute("SELECT decks FROM anki.col")
+    return [(int(deck_id), deck['name']) for deck_id, deck in json.loads(cursor.fetchone()[0]).items()]
+
+def import_anki(filepath, front_is_native=True, progress=None):
+    """
+    Imports every note of an Anki collection as a word, one dictionary per Anki deck.
+    The first two note fields become the native/learned words (swapped if front_is_native is False),
+    a third field becomes the notes, and the scheduling of each note's first card is carried over.
+    Notes whose native or learned field is empty once HTML and sound tags are removed (image- or
+    audio-only cards) are skipped. `progress(done, total)` is called after each batch with the number
+    of notes processed. The import is one transaction, so a failed import adds nothing.
+    Returns (imported_words, skipped_notes).
+    """
+    conn, tmp_path = database.connect(), None
+    try:
+        conn.create_function('anki_field', 2, _field, deterministic=True)
+        cursor = conn.cursor()
+        if zipfile.is_zipfile(filepath): tmp_path = database.attach_serialized(conn, _read_collection(filepath), 'anki')
+        else: cursor.execute("ATTACH DATABASE ? AS anki", (filepath,))
+        crt = cursor.execute("SELECT crt FROM anki.col").fetchone()[0]
+
+        cursor.execute("CREATE TEMP TABLE anki_decks (did INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+        cursor.executemany("INSERT INTO temp.anki_decks (did, name) VALUES (?, ?)", _anki_decks(cursor))
+        # One card per note: the one with the lowest template ordinal. Cards sitting in a filtered
+        # deck are mapped back to their home deck and original due value.
+        cursor.execute("""
+            CREATE TEMP TABLE anki_cards AS
+            SELECT nid, MIN(ord) AS ord, CASE WHEN odid != 0 THEN odid ELSE did END AS did, type, ivl, factor,
+                   CASE WHEN odid != 0 THEN odue ELSE due END AS due
+            FROM anki.cards GROUP BY nid
+        """)
+        cursor.execute("CREATE UNIQUE INDEX temp.anki_cards_nid ON anki_cards (nid)")
+        cursor.execute("INSERT OR IGNORE INTO main.dictionaries (name) SELECT name FROM temp.anki_decks WHERE did IN (SELECT did FROM temp.anki_cards)")
+
+        native_index, learned_index = (0, 1) if front_is_native else (1, 0)
+        total = cursor.execute("SELECT COUNT(*) FROM anki.notes n JOIN temp.anki_cards c ON c.nid = n.id").fetchone()[0]
+        # Anki types: 0 = new, 1/3 = (re)learning with `due` as a unix timestamp, 2 = review with `due` in days since crt.
+        insert = """
+            INSERT INTO main.words (native_word, learned_word, notes, dictionary_id, easiness, interval, next_review_date)
+            SELECT anki_field(n.flds, ?), anki_field(n.flds, ?), NULLIF(anki_field(n.flds, 2), ''), d.id,
+                   CASE WHEN c.factor > 0 THEN c.factor / 1000.0 ELSE 2.5 END,
+                   CASE WHEN c.type = 2 AND c.ivl > 0 THEN c.ivl ELSE 1 END,
+                   CASE c.type WHEN 2 THEN date(? + c.due * 86400, 'unixepoch', 'localtime')
+                               WHEN 1 THEN date(c.due, 'unixepoch', 'localtime')
+                               WHEN 3 THEN date(c.due, 'unixepoch', 'localtime')
+                               ELSE ? END
+            FROM anki.notes n JOIN temp.anki_cards c ON c.nid = n.id
+            JOIN temp.anki_decks ad ON ad.did = c.did JOIN main.dictionaries d ON d.name = ad.name
+            WHERE n.id > ? AND n.id <= ? AND anki_field(n.flds, ?) <> '' AND anki_field(n.flds, ?) <> ''
+        """
+        today, last_id, done, imported = date.today().isoformat(), -1, 0, 0
+        while True:
+            batch_end = cursor.execute("SELECT MAX(id) FROM (SELECT id FROM anki.notes WHERE id > ? ORDER BY id LIMIT ?)", (last_id, BATCH_SIZE)).fetchone()[0]
+            if batch_end is None: break
+            cursor.execute(insert, (native_index, learned_index, crt, today, last_id, batch_end, native_index, learned_index))
+            imported += cursor.rowcount
+            done += cursor.execute("SELECT COUNT(*) FROM anki.notes n JOIN temp.anki_cards c ON c.nid = n.id WHERE n.id > ? AND n.id <= ?", (last_id, batch_end)).fetchone()[0]
+            last_id = batch_end
+            if progress: progress(done, total)
+        conn.commit()
+        return imported, total - imported
+    finally:
+        conn.close()
+        if tmp_path: os.remove(tmp_path)
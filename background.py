@@ -0,0 +1,92 @@
+# background.py
+# Shared background execution for Powerlang: bounded worker pools per kind of work,
+# cancellation tokens tied to panel lifetime, and delivery of results back to the GUI thread.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import wx
+
+# name: (worker threads, maximum queued + running tasks or None for no limit, cancellable)
+# The database pool has a single worker so writes are applied in order, and its tasks are
+# never dropped -- not when it is busy, cancelled or shutting down -- only their results stop being delivered.
+POOLS = {
+    'db': (1, None, False),
+    'network': (4, 8, True),
+    'audio': (2, 4, True),
+    'tts': (3, None, True), # Sentences of a long text synthesized ahead of playback; speak() limits itself to one text at a time
+}
+
+class CancelToken:
+    """Marks a group of tasks (usually everything started by one panel) as no longer wanted."""
+    def __init__(self):
+        self._event = threading.Event()
+    def cancel(self): self._event.set()
+    @property
+    def cancelled(self): return self._event.is_set()
+
+class _Pool:
+    def __init__(self, name, workers, limit, cancellable):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"powerlang-{name}")
+        self.slots = threading.BoundedSemaphore(limit) if limit else None
+        self.cancellable = cancellable
+
+_pools = {name: _Pool(name, *config) for name, config in POOLS.items()}
+_shutting_down = False
+
+def deliver(token, callback, *args):
+    """Calls `callback(*args)` on the GUI thread unless the token has been cancelled by then."""
+    def run():
+        if token is None or not token.cancelled: callback(*args)
+    wx.CallAfter(run)
+
+def submit(kind, func, *args, token=None, on_done=None, on_error=None, **kwargs):
+    """
+    Runs `func(*args, **kwargs)` on the pool for `kind`. `on_done(result)` or `on_error(exception)`
+    are called on the GUI thread. Returns the future, whose result is func's return value or None if it
+    failed or was cancelled before it started. Returns None instead if the pool is full or shutting down,
+    in which case the request is dropped the same way a busy audio player ignores new requests.
+    The 'db' pool has no limit, so writes such as review grades are always queued.
+    """
+    pool = _pools[kind]
+    if _shutting_down:
+        print(f"Background pool '{kind}' is shutting down. New request ignored.")
+        return None
+    if pool.slots is not None and not pool.slots.acquire(blocking=False):
+        print(f"Background pool '{kind}' is busy. New request ignored.")
+        return None
+    def task():
+        try:
+            if pool.cancellable and token is not None and token.cancelled: return
+            result = func(*args, **kwargs)
+            if on_done: deliver(token, on_done, result)
+            return result
+        except Exception as e:
+            if on_error: deliver(token, on_error, e)
+            else: print(f"An error occurred in background task {getattr(func, '__name__', func)}: {e}")
+        finally:
+            if pool.slots is not None: pool.slots.release()
+    try: return pool.executor.submit(task)
+    except RuntimeError:
+        if pool.slots is not None: pool.slots.release()
+        return None
+
+def panel_token(window):
+    """Returns a CancelToken that is cancelled when `window` is destroyed."""
+    token = CancelToken()
+    def on_destroy(event):
+        if event.GetEventObject() is window: token.cancel()
+        event.Skip()
+    window.Bind(wx.EVT_WINDOW_DESTROY, on_destroy)
+    return token
+
+def shutting_down():
+    """True once shutdown() has started; long database jobs check this to stop at a safe point."""
+    return _shutting_down
+
+def shutdown():
+    """Stops accepting work, drops queued cancellable tasks and waits for pending database writes."""
+    global _shutting_down
+    _shutting_down = True
+    for name, pool in _pools.items():
+        if pool.cancellable: pool.executor.shutdown(wait=False, cancel_futures=True)
+    _pools['db'].executor.shutdown(wait=True)
@@ -5,13 +5,74 @@ import sqlite3
 import os
 import random
 import csv
+import tempfile
+from array import array
 from datetime import date, timedelta
 
 DB_FILE = "powerlang.db"
+DELETE_CHUNK_SIZE = 5000 # Words removed per transaction when deleting a dictionary
+MATURE_INTERVAL = 21 # Cards with an interval of 21+ days count as "mature", like in Anki
+
+# review_forecast is a materialized histogram of words per (dictionary, due date), kept
+# in sync by triggers so statistics never have to scan the words table. Missing SRS values
+# count as the defaults a new word gets, since the forecast columns cannot hold NULL.
+SRS_DEFAULTS = {'easiness': "2.5", 'interval': "1", 'next_review_date': "date('now', 'localtime')"}
+FORECAST_TRIGGERS = {
+    'words_forecast_insert': '''
+        CREATE TRIGGER words_forecast_insert AFTER INSERT ON words BEGIN
+            INSERT OR IGNORE INTO review_forecast (dictionary_id, due_date) VALUES (NEW.dictionary_id, {new_date});
+            UPDATE review_forecast SET cards = cards + 1, mature = mature + ({new_interval} >= {mature}), ease_total = ease_total + {new_easiness}
+            WHERE dictionary_id = NEW.dictionary_id AND due_date = {new_date};
+        END''',
+    'words_forecast_delete': '''
+        CREATE TRIGGER words_forecast_delete AFTER DELETE ON words BEGIN
+            UPDATE review_forecast SET cards = cards - 1, mature = mature - ({old_interval} >= {mature}), ease_total = ease_total - {old_easiness}
+            WHERE dictionary_id = OLD.dictionary_id AND due_date = {old_date};
+            DELETE FROM review_forecast WHERE dictionary_id = OLD.dictionary_id AND due_date = {old_date} AND cards <= 0;
+        END''',
+    'words_forecast_update': '''
+        CREATE TRIGGER words_forecast_update AFTER UPDATE OF dictionary_id, easiness, interval, next_review_date ON words BEGIN
+            UPDATE review_forecast SET cards = cards - 1, mature = mature - ({old_interval} >= {mature}), ease_total = ease_total - {old_easiness}
+            WHERE dictionary_id = OLD.dictionary_id AND due_date = {old_date};
+            DELETE FROM review_forecast WHERE dictionary_id = OLD.dictionary_id AND due_date = {old_date} AND cards <= 0;
+            INSERT OR IGNORE INTO review_forecast (dictionary_id, due_date) VALUES (NEW.dictionary_id, {new_date});
+            UPDATE review_forecast SET cards = cards + 1, mature = mature + ({new_interval} >= {mature}), ease_total = ease_total + {new_easiness}
+            WHERE dictionary_id = NEW.dictionary_id AND due_date = {new_date};
+        END''',
+}
+
+def _srs_value(column, row=None):
+    """SQL for a words SRS column (of the NEW/OLD row in a trigger) with NULL replaced by its default."""
+    return f"COALESCE({row + '.' if row else ''}{column}, {SRS_DEFAULTS[column]})"
+
+def _forecast_trigger_sql(sql):
+    short = {'easiness': 'easiness', 'interval': 'interval', 'next_review_date': 'date'}
+    values = {f"{row.lower()}_{short[column]}": _srs_value(column, row) for row in ('NEW', 'OLD') for column in SRS_DEFAULTS}
+    return sql.format(mature=MATURE_INTERVAL, **values)
+
+# Keep the external-content words_trigram index in step with words.
+TRIGRAM_TRIGGERS = {
+    'words_trigram_insert': '''
+        CREATE TRIGGER words_trigram_insert AFTER INSERT ON words BEGIN
+            INSERT INTO words_trigram (rowid, native_word, learned_word) VALUES (NEW.id, NEW.native_word, NEW.learned_word);
+        END''',
+    'words_trigram_delete': '''
+        CREATE TRIGGER words_trigram_delete AFTER DELETE ON words BEGIN
+            INSERT INTO words_trigram (words_trigram, rowid, native_word, learned_word) VALUES ('delete', OLD.id, OLD.native_word, OLD.learned_word);
+        END''',
+    'words_trigram_update': '''
+        CREATE TRIGGER words_trigram_update AFTER UPDATE OF native_word, learned_word ON words BEGIN
+            INSERT INTO words_trigram (words_trigram, rowid, native_word, learned_word) VALUES ('delete', OLD.id, OLD.native_word, OLD.learned_word);
+            INSERT INTO words_trigram (rowid, native_word, learned_word) VALUES (NEW.id, NEW.native_word, NEW.learned_word);
+        END''',
+}
 
 def init_database():
     conn = sqlite3.connect(DB_FILE)
     cursor = conn.cursor()
+    # Write-ahead logging lets the GUI keep reading while the background database worker writes.
+    # The setting is stored in the database file, so it only has to be made once.
+    cursor.execute("PRAGMA journal_mode = WAL")
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='dictionaries'")
     if cursor.fetchone() is None:
         cursor.execute('CREATE TABLE dictionaries (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)')
@@ -21,7 +82,7 @@ def init_database():
             CREATE TABLE words (
                 id INTEGER PRIMARY KEY, native_word TEXT NOT NULL, learned_word TEXT NOT NULL,
                 notes TEXT, dictionary_id INTEGER NOT NULL,
-                FOREIGN KEY (dictionary_id) REFERENCES dictionaries (id)
+                FOREIGN KEY (dictionary_id) REFERENCES dictionaries (id) ON DELETE CASCADE
             )
         ''')
     cursor.execute("PRAGMA table_info(words)")
@@ -31,47 +92,163 @@ def init_database():
     if 'next_review_date' not in columns:
         today = date.today().isoformat()
         cursor.execute(f"ALTER TABLE words ADD COLUMN next_review_date TEXT DEFAULT '{today}'")
+    cursor.execute("PRAGMA foreign_key_list(words)")
+    if any(fk[2] == 'dictionaries' and fk[6] != 'CASCADE' for fk in cursor.fetchall()):
+        # SQLite cannot alter a foreign key in place, so databases created before
+        # cascading deletes are rebuilt once. The forecast triggers are recreated below.
+        for name in FORECAST_TRIGGERS: cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        # Carry the column defaults over as they were, so inserts that leave out the SRS columns behave the same.
+        cursor.execute("PRAGMA table_info(words)")
+        defaults = {info[1]: info[4] for info in cursor.fetchall()}
+        review_default = defaults.get('next_review_date') or "(date('now', 'localtime'))"
+        cursor.execute(f'''
+            CREATE TABLE words_new (
+                id INTEGER PRIMARY KEY, native_word TEXT NOT NULL, learned_word TEXT NOT NULL,
+                notes TEXT, dictionary_id INTEGER NOT NULL, easiness REAL DEFAULT 2.5, interval INTEGER DEFAULT 1, next_review_date TEXT DEFAULT {review_default},
+                FOREIGN KEY (dictionary_id) REFERENCES dictionaries (id) ON DELETE CASCADE
+            )
+        ''')
+        cursor.execute("""
+            INSERT INTO words_new (id, native_word, learned_word, notes, dictionary_id, easiness, interval, next_review_date)
+            SELECT id, native_word, learned_word, notes, dictionary_id, easiness, interval, next_review_date FROM words
+        """)
+        cursor.execute("DROP TABLE words")
+        cursor.execute("ALTER TABLE words_new RENAME TO words")
+    cursor.execute("CREATE INDEX IF NOT EXISTS words_dictionary_id ON words (dictionary_id)")
+    # Dictionaries whose chunked delete was interrupted; they are hidden and the delete is resumed on startup.
+    cursor.execute("CREATE TABLE IF NOT EXISTS pending_deletions (dictionary_id INTEGER PRIMARY KEY REFERENCES dictionaries (id) ON DELETE CASCADE)")
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='review_forecast'")
+    backfill_forecast = cursor.fetchone() is None
+    if backfill_forecast:
+        cursor.execute('''
+            CREATE TABLE review_forecast (
+                dictionary_id INTEGER NOT NULL, due_date TEXT NOT NULL, cards INTEGER NOT NULL DEFAULT 0,
+                mature INTEGER NOT NULL DEFAULT 0, ease_total REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (dictionary_id, due_date)
+            ) WITHOUT ROWID
+        ''')
+    for name, sql in FORECAST_TRIGGERS.items():
+        # Triggers from older versions of this file are replaced, and the histogram they
+        # may have miscounted is rebuilt, so fixes to their SQL reach existing databases.
+        sql = _forecast_trigger_sql(sql)
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type='trigger' AND name=?", (name,))
+        existing = cursor.fetchone()
+        if existing is not None and existing[0].strip() == sql.strip(): continue
+        if existing is not None: cursor.execute(f"DROP TRIGGER {name}"); backfill_forecast = True
+        cursor.execute(sql)
+    if backfill_forecast:
+        # Filled from the existing words here; the triggers keep it current from then on.
+        cursor.execute("DELETE FROM review_forecast")
+        cursor.execute("""
+            INSERT INTO review_forecast (dictionary_id, due_date, cards, mature, ease_total)
+            SELECT dictionary_id, {date}, COUNT(*), SUM({interval} >= ?), SUM({easiness})
+            FROM words GROUP BY dictionary_id, {date}
+        """.format(date=_srs_value('next_review_date'), interval=_srs_value('interval'), easiness=_srs_value('easiness')), (MATURE_INTERVAL,))
+    # Translation memory: case-insensitive exact lookups in both directions, plus a trigram
+    # full-text index for fuzzy matches when this SQLite build has FTS5.
+    cursor.execute("CREATE INDEX IF NOT EXISTS words_native_word ON words (native_word COLLATE NOCASE)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS words_learned_word ON words (learned_word COLLATE NOCASE)")
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='words_trigram'")
+    if cursor.fetchone() is None:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE words_trigram USING fts5(native_word, learned_word, content='words', content_rowid='id', tokenize='trigram')")
+            cursor.execute("INSERT INTO words_trigram (words_trigram) VALUES ('rebuild')")
+        except sqlite3.OperationalError as e: print(f"Fuzzy translation memory disabled: {e}")
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='words_trigram'")
+    if cursor.fetchone() is not None:
+        # Per-trigram row counts, so fuzzy lookups can start from the rarest trigrams of a word.
+        cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS words_trigram_vocab USING fts5vocab(words_trigram, 'row')")
+        for name, sql in TRIGRAM_TRIGGERS.items():
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='trigger' AND name=?", (name,))
+            if cursor.fetchone() is None: cursor.execute(sql)
     conn.commit()
     conn.close()
 
-def delete_dictionary(dict_id):
-    """Deletes a dictionary and all words contained within it."""
+def connect():
+    """Opens the database with foreign key enforcement, which SQLite leaves off by default."""
     conn = sqlite3.connect(DB_FILE)
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+def attach_serialized(conn, data, schema_name):
+    """
+    Attaches an SQLite database held in memory as `data` under `schema_name`.
+    Returns the path of a temporary file the caller must remove afterwards, or None.
+    """
+    conn.execute(f"ATTACH DATABASE ':memory:' AS {schema_name}")
+    if hasattr(conn, 'deserialize'):
+        conn.deserialize(data, name=schema_name)
+        return None
+    # Python < 3.11 cannot deserialize, so fall back to a temporary file.
+    conn.execute(f"DETACH DATABASE {schema_name}")
+    with tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False) as tmp: tmp.write(data)
+    conn.execute(f"ATTACH DATABASE ? AS {schema_name}", (tmp.name,))
+    return tmp.name
+
+def delete_dictionary(dict_id, progress=None, should_stop=None):
+    """
+    Deletes a dictionary and all words contained within it. Words are removed in short
+    transactions of DELETE_CHUNK_SIZE so a huge dictionary never locks the database for long;
+    `progress(deleted)` is called after each one. If `should_stop()` returns True between chunks,
+    the delete stops early and the dictionary stays hidden in pending_deletions until
+    get_pending_deletions() is used to finish it. Returns the number of deleted words.
+    """
+    conn = connect()
     cursor = conn.cursor()
-    # Delete words first to maintain foreign key integrity
-    cursor.execute("DELETE FROM words WHERE dictionary_id = ?", (dict_id,))
-    # Then delete the dictionary itself
+    cursor.execute("INSERT OR IGNORE INTO pending_deletions (dictionary_id) VALUES (?)", (dict_id,))
+    conn.commit()
+    deleted = 0
+    while True:
+        if should_stop and should_stop():
+            conn.close()
+            return deleted
+        cursor.execute("DELETE FROM words WHERE id IN (SELECT id FROM words WHERE dictionary_id = ? LIMIT ?)", (dict_id, DELETE_CHUNK_SIZE))
+        conn.commit()
+        if cursor.rowcount <= 0: break
+        deleted += cursor.rowcount
+        if progress: progress(deleted)
+    # Anything added meanwhile, and the pending_deletions row, go with the dictionary through ON DELETE CASCADE.
     cursor.execute("DELETE FROM dictionaries WHERE id = ?", (dict_id,))
     conn.commit()
     conn.close()
+    return deleted
+
+def get_pending_deletions():
+    """Returns the ids of dictionaries whose delete was interrupted."""
+    conn = connect()
+    cursor = conn.cursor()
+    cursor.execute("SELECT dictionary_id FROM pending_deletions")
+    dict_ids = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return dict_ids
 
 def get_due_cards():
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     cursor = conn.cursor()
     today = date.today().isoformat()
-    cursor.execute("SELECT id, native_word, learned_word, easiness, interval, next_review_date FROM words WHERE next_review_date <= ?", (today,))
+    cursor.execute("SELECT id, native_word, learned_word, easiness, interval, next_review_date FROM words WHERE next_review_date <= ? AND dictionary_id NOT IN (SELECT dictionary_id FROM pending_deletions)", (today,))
     due_cards = cursor.fetchall()
     conn.close()
     random.shuffle(due_cards)
     return due_cards
 
 def update_word_srs(word_id, easiness, interval, next_review_date):
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     cursor = conn.cursor()
     cursor.execute("UPDATE words SET easiness = ?, interval = ?, next_review_date = ? WHERE id = ?", (easiness, interval, next_review_date.isoformat(), word_id))
     conn.commit()
     conn.close()
 
 def get_dictionaries():
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     cursor = conn.cursor()
-    cursor.execute("SELECT id, name FROM dictionaries ORDER BY name")
+    cursor.execute("SELECT id, name FROM dictionaries WHERE id NOT IN (SELECT dictionary_id FROM pending_deletions) ORDER BY name")
     dictionaries = cursor.fetchall()
     conn.close()
     return dictionaries
 
 def create_dictionary(name):
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     cursor = conn.cursor()
     try:
         cursor.execute("INSERT INTO dictionaries (name) VALUES (?)", (name,))
@@ -82,8 +259,47 @@ def create_dictionary(name):
     finally:
         conn.close()
 
+def get_dictionary_stats():
+    """Returns {dictionary_id: (total, due_today, young, mature, average_ease)} from the forecast table."""
+    conn = connect()
+    cursor = conn.cursor()
+    today = date.today().isoformat()
+    cursor.execute("""
+        SELECT d.id, COALESCE(SUM(f.cards), 0), COALESCE(SUM(CASE WHEN f.due_date <= ? THEN f.cards END), 0),
+               COALESCE(SUM(f.mature), 0), COALESCE(SUM(f.ease_total), 0)
+        FROM dictionaries d LEFT JOIN review_forecast f ON f.dictionary_id = d.id GROUP BY d.id
+    """, (today,))
+    stats = {}
+    for dict_id, total, due, mature, ease_total in cursor.fetchall():
+        stats[dict_id] = (total, due, total - mature, mature, ease_total / total if total else 0.0)
+    conn.close()
+    return stats
+
+def get_due_forecast(days, dictionary_id=None):
+    """
+    Returns an array of length `days` holding the number of cards due on each day,
+    starting today. Overdue cards are counted as due today.
+    """
+    conn = connect()
+    cursor = conn.cursor()
+    today = date.today()
+    last_day = (today + timedelta(days=days - 1)).isoformat()
+    query = "SELECT due_date, SUM(cards) FROM review_forecast WHERE due_date <= ?"
+    params = [last_day]
+    if dictionary_id is not None:
+        query += " AND dictionary_id = ?"
+        params.append(dictionary_id)
+    cursor.execute(query + " GROUP BY due_date", params)
+    forecast = array('q', [0]) * days
+    for due_date, cards in cursor.fetchall():
+        try: offset = (date.fromisoformat(due_date) - today).days
+        except (TypeError, ValueError): offset = 0 # Unparseable dates are treated as due now
+        forecast[max(offset, 0)] += cards
+    conn.close()
+    return forecast
+
 def get_words(dictionary_id):
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     cursor = conn.cursor()
     cursor.execute("SELECT id, native_word, learned_word, notes FROM words WHERE dictionary_id = ? ORDER BY native_word", (dictionary_id,))
     words = cursor.fetchall()
@@ -91,7 +307,7 @@ def get_words(dictionary_id):
     return words
 
 def add_word(native, learned, notes, dict_id):
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     cursor = conn.cursor()
     today = date.today().isoformat()
     cursor.execute("INSERT INTO words (native_word, learned_word, notes, dictionary_id, easiness, interval, next_review_date) VALUES (?, ?, ?, ?, 2.5, 1, ?)", (native, learned, notes, dict_id, today))
@@ -99,32 +315,32 @@ def add_word(native, learned, notes, dict_id):
     conn.close()
 
 def update_word(word_id, native, learned, notes):
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     cursor = conn.cursor()
     cursor.execute("UPDATE words SET native_word = ?, learned_word = ?, notes = ? WHERE id = ?", (native, learned, notes, word_id))
     conn.commit()
     conn.close()
 
 def delete_word(word_id):
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     cursor = conn.cursor()
     cursor.execute("DELETE FROM words WHERE id = ?", (word_id,))
     conn.commit()
     conn.close()
 
 def get_random_word():
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     cursor = conn.cursor()
-    cursor.execute("SELECT native_word, learned_word FROM words")
+    cursor.execute("SELECT native_word, learned_word FROM words WHERE dictionary_id NOT IN (SELECT dictionary_id FROM pending_deletions)")
     all_words = cursor.fetchall()
     conn.close()
     if not all_words: return None
     return random.choice(all_words)
 
 def get_random_words(count=20): # Default to 20 for the new quiz length
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     cursor = conn.cursor()
-    cursor.execute("SELECT native_word, learned_word FROM words")
+    cursor.execute("SELECT native_word, learned_word FROM words WHERE dictionary_id NOT IN (SELECT dictionary_id FROM pending_deletions)")
     all_words = cursor.fetchall()
     conn.close()
     if not all_words: return []
@@ -132,7 +348,7 @@ def get_random_words(count=20): # Default to 20 for the new quiz length
     return random.sample(all_words, count)
 
 def export_all_to_csv(filepath):
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     cursor = conn.cursor()
     query = "SELECT w.native_word, w.learned_word, w.notes, d.name FROM words w JOIN dictionaries d ON w.dictionary_id = d.id ORDER BY d.name, w.native_word"
     cursor.execute(query)
@@ -145,7 +361,7 @@ def export_all_to_csv(filepath):
     return len(all_words)
 
 def import_from_csv(filepath):
-    conn = sqlite3.connect(DB_FILE)
+    conn = connect()
     cursor = conn.cursor()
     imported_count = 0
     dictionary_cache = {}
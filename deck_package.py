@@ -0,0 +1,150 @@
+# deck_package.py
+# Reads and writes Powerlang deck packages: a single zip holding an SQLite deck,
+# a manifest, and the matching TTS audio addressed by content hash.
+
+import os
+import re
+import json
+import hashlib
+import tempfile
+import zipfile
+from datetime import date
+import database
+
+FORMAT_NAME = "powerlang-deck"
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DECK_NAME = "deck.sqlite"
+AUDIO_PREFIX = "audio/"
+AUDIO_EXTENSIONS = ('.mp3', '.wav') # gTTS writes mp3, the local TTS engines write wav
+# tts_cache file names: '[engine_]<lang>_<md5 of text>.<ext>', e.g. 'sv_<md5>.mp3' or 'espeak_zh-CN_<md5>.wav'
+_audio_name_re = re.compile(r'(?:[a-z0-9]+_)?[A-Za-z]{2,3}(?:-[A-Za-z]{2,4})?_[0-9a-f]{32}\.(?:mp3|wav)')
+_content_hash_re = re.compile(r'[0-9a-f]{64}')
+
+DECK_SCHEMA = '''
+    CREATE TABLE deck.dictionaries (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+    CREATE TABLE deck.words (
+        id INTEGER PRIMARY KEY, native_word TEXT NOT NULL, learned_word TEXT NOT NULL, notes TEXT,
+        dictionary_id INTEGER NOT NULL, easiness REAL, interval INTEGER, next_review_date TEXT
+    );
+'''
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''): digest.update(block)
+    return digest.hexdigest()
+
+def _cached_audio_for(texts, cache_dir):
+    """Returns the tts_cache file names ('[engine_]<lang>_<md5 of text>.<ext>') that belong to any of the given texts."""
+    if not os.path.isdir(cache_dir): return []
+    wanted = {hashlib.md5(text.encode('utf-8')).hexdigest() for text in texts if text}
+    return [name for name in os.listdir(cache_dir) if name.endswith(AUDIO_EXTENSIONS) and name[:-4].rpartition('_')[2] in wanted]
+
+def _serialize_deck(conn):
+    if hasattr(conn, 'serialize'): return conn.serialize(name='deck')
+    # Python < 3.11 cannot serialize an attached database, so go through a backup file.
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, DECK_NAME)
+        conn.execute("VACUUM deck INTO ?", (path,))
+        with open(path, 'rb') as f: return f.read()
+
+def export_deck(filepath, cache_dir, dictionary_ids=None):
+    """
+    Writes the given dictionaries (all of them if None) and their cached audio to a deck package.
+    Returns (word_count, audio_count).
+    """
+    conn = database.connect()
+    cursor = conn.cursor()
+    cursor.execute("ATTACH DATABASE ':memory:' AS deck")
+    cursor.executescript(DECK_SCHEMA)
+    if dictionary_ids is None: cursor.execute("SELECT id FROM dictionaries"); dictionary_ids = [row[0] for row in cursor.fetchall()]
+    placeholders = ",".join("?" * len(dictionary_ids))
+    cursor.execute(f"INSERT INTO deck.dictionaries (id, name) SELECT id, name FROM main.dictionaries WHERE id IN ({placeholders})", dictionary_ids)
+    cursor.execute(f"""
+        INSERT INTO deck.words (native_word, learned_word, notes, dictionary_id, easiness, interval, next_review_date)
+        SELECT native_word, learned_word, notes, dictionary_id, easiness, interval, next_review_date FROM main.words WHERE dictionary_id IN ({placeholders})
+    """, dictionary_ids)
+    conn.commit()
+    cursor.execute("SELECT name FROM deck.dictionaries ORDER BY name")
+    dictionary_names = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT native_word, learned_word FROM deck.words")
+    texts = {text for pair in cursor.fetchall() for text in pair}
+    word_count = cursor.execute("SELECT COUNT(*) FROM deck.words").fetchone()[0]
+    deck_bytes = _serialize_deck(conn)
+    conn.close()
+
+    audio = {}
+    with zipfile.ZipFile(filepath, 'w') as zf:
+        zf.writestr(DECK_NAME, deck_bytes, compress_type=zipfile.ZIP_DEFLATED)
+        stored = set()
+        for name in _cached_audio_for(texts, cache_dir):
+            path = os.path.join(cache_dir, name)
+            content_hash = _hash_file(path)
+            audio[name] = content_hash
+            if content_hash in stored: continue
+            # mp3 data is already compressed, so store it as-is; wav compresses well.
+            extension = os.path.splitext(name)[1]
+            zf.write(path, AUDIO_PREFIX + content_hash + extension, compress_type=zipfile.ZIP_STORED if extension == '.mp3' else zipfile.ZIP_DEFLATED)
+            stored.add(content_hash)
+        manifest = {'format': FORMAT_NAME, 'version': FORMAT_VERSION, 'created': date.today().isoformat(),
+                    'dictionaries': dictionary_names, 'word_count': word_count, 'audio': audio}
+        zf.writestr(MANIFEST_NAME, json.dumps(manifest, indent=4, ensure_ascii=False), compress_type=zipfile.ZIP_DEFLATED)
+    return word_count, len(audio)
+
+def read_manifest(zf):
+    manifest = json.loads(zf.read(MANIFEST_NAME).decode('utf-8'))
+    if manifest.get('format') != FORMAT_NAME: raise ValueError("Not a Powerlang deck package.")
+    if manifest.get('version', 0) > FORMAT_VERSION: raise ValueError(f"Deck package version {manifest['version']} is newer than this version of Powerlang supports.")
+    return manifest
+
+def _install_audio(zf, name, content_hash, cache_dir):
+    """Streams one audio entry into the cache unless it is already there. Returns True if it was written."""
+    # Manifest keys become file names in tts_cache, so only accept names the TTS cache itself would use.
+    if not isinstance(name, str) or not _audio_name_re.fullmatch(name) or not isinstance(content_hash, str) or not _content_hash_re.fullmatch(content_hash):
+        print(f"Skipping audio entry with an unexpected name: {name!r}")
+        return False
+    target = os.path.join(cache_dir, name)
+    if os.path.exists(target): return False
+    try: entry = zf.getinfo(AUDIO_PREFIX + content_hash + os.path.splitext(name)[1])
+    except KeyError:
+        print(f"Audio entry for {name} is missing from the deck package.")
+        return False
+    partial, digest = target + ".part", hashlib.sha256()
+    with zf.open(entry) as src, open(partial, 'wb') as dst:
+        for block in iter(lambda: src.read(65536), b''): digest.update(block), dst.write(block)
+    if digest.hexdigest() != content_hash:
+        os.remove(partial)
+        print(f"Skipping corrupt audio entry for {name}")
+        return False
+    os.replace(partial, target)
+    return True
+
+def import_deck(filepath, cache_dir):
+    """
+    Adds the words of a deck package to the local database, creating dictionaries by name
+    as needed. Imported words start a fresh review schedule, as with CSV imports. Words already in
+    the dictionary with the same native and learned word are skipped, so re-importing a deck is harmless.
+    Audio already present in the local cache is skipped. Returns (word_count, audio_count).
+    """
+    with zipfile.ZipFile(filepath, 'r') as zf:
+        manifest = read_manifest(zf)
+        conn, tmp_path = database.connect(), None
+        try:
+            cursor = conn.cursor()
+            tmp_path = database.attach_serialized(conn, zf.read(DECK_NAME), 'deck')
+            cursor.execute("INSERT OR IGNORE INTO main.dictionaries (name) SELECT name FROM deck.dictionaries")
+            cursor.execute("""
+                INSERT INTO main.words (native_word, learned_word, notes, dictionary_id, easiness, interval, next_review_date)
+                SELECT w.native_word, w.learned_word, w.notes, d.id, 2.5, 1, ?
+                FROM deck.words w JOIN deck.dictionaries dd ON w.dictionary_id = dd.id JOIN main.dictionaries d ON d.name = dd.name
+                WHERE NOT EXISTS (SELECT 1 FROM main.words m WHERE m.dictionary_id = d.id AND m.native_word = w.native_word AND m.learned_word = w.learned_word)
+            """, (date.today().isoformat(),))
+            word_count = cursor.rowcount
+            conn.commit()
+        finally:
+            conn.close()
+            if tmp_path: os.remove(tmp_path)
+        if not os.path.exists(cache_dir): os.makedirs(cache_dir)
+        audio_count = sum(_install_audio(zf, name, content_hash, cache_dir) for name, content_hash in manifest.get('audio', {}).items())
+    return word_count, audio_count
@@ -0,0 +1,60 @@
+# maintenance.py
+# Background upkeep for the Powerlang database: planner statistics, reclaiming free pages
+# and integrity checks. Meant to run on the background 'db' pool while the user is idle.
+
+import os
+import time
+import database
+
+AUTO_VACUUM_INCREMENTAL = 2
+ANALYSIS_LIMIT = 1000 # Rows sampled per index by ANALYZE, so the statistics pass stays short on huge tables
+
+class MaintenanceReport:
+    def __init__(self):
+        self.reclaimed_bytes, self.integrity_ok, self.integrity_errors, self.timings, self.vacuum_pending = 0, True, [], {}, False
+    def summary(self):
+        steps = ", ".join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in self.timings.items())
+        status = "ok" if self.integrity_ok else f"{len(self.integrity_errors)} integrity problem(s)"
+        pending = ", full vacuum pending until run from the menu" if self.vacuum_pending else ""
+        return f"reclaimed {self.reclaimed_bytes / 1024:.0f} KB, integrity {status}{pending} ({steps})"
+
+def _timed(report, step, func):
+    start = time.perf_counter()
+    result = func()
+    report.timings[step] = time.perf_counter() - start
+    return result
+
+def run_maintenance(full_vacuum=False):
+    """
+    Runs all maintenance steps and returns a MaintenanceReport. The one-time full VACUUM that
+    switches on incremental vacuuming rewrites the whole file and locks the database meanwhile,
+    so it only runs when `full_vacuum` is set, i.e. when the user started maintenance from the menu.
+    """
+    report = MaintenanceReport()
+    size_before = os.path.getsize(database.DB_FILE)
+    conn = database.connect()
+    cursor = conn.cursor()
+    # Incremental vacuum only works once auto_vacuum is switched on, which needs one full VACUUM.
+    if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+        if full_vacuum:
+            cursor.execute(f"PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}")
+            _timed(report, "vacuum", lambda: cursor.execute("VACUUM"))
+        else: report.vacuum_pending = True
+    else:
+        # executescript steps the pragma to completion; a plain execute frees only one page.
+        _timed(report, "incremental vacuum", lambda: conn.executescript("PRAGMA incremental_vacuum"))
+    # PRAGMA optimize only analyzes tables whose statistics look stale; the first run needs ANALYZE itself.
+    cursor.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+    has_stats = cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='sqlite_stat1'").fetchone() is not None
+    _timed(report, "optimize" if has_stats else "analyze", lambda: cursor.execute("PRAGMA optimize" if has_stats else "ANALYZE"))
+    conn.commit()
+    # With write-ahead logging, freed pages only leave the file once the log is checkpointed.
+    _timed(report, "checkpoint", lambda: cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall())
+    problems = _timed(report, "quick check", lambda: [row[0] for row in cursor.execute("PRAGMA quick_check").fetchall()])
+    problems += [f"Foreign key violation in {row[0]} row {row[1]}" for row in cursor.execute("PRAGMA foreign_key_check").fetchall()]
+    if problems != ["ok"]:
+        report.integrity_ok, report.integrity_errors = False, [p for p in problems if p != "ok"]
+    conn.close()
+    report.reclaimed_bytes = max(size_before - os.path.getsize(database.DB_FILE), 0)
+    print(f"Database maintenance: {report.summary()}")
+    return report
@@ -4,14 +4,19 @@
 import wx
 import database
 import random
-import threading
 import urllib.parse
 import requests
 import json
 import os
 import sys
+import time
 from datetime import date, timedelta
 import tts_handler
+import background
+import deck_package
+import anki_import
+import maintenance
+import translation_memory
 from translations import set_language, _, get_translated_lang_name
 import deepl
 
@@ -19,6 +24,11 @@ import deepl
 app_settings = {'native_language': 'English', 'learning_language': 'Swedish', 'keep_tts_cache': True, 'ui_language': 'en', 'deepl_api_key': ''}
 lang_codes = {"Arabic": "ar", "Chinese (Mandarin)": "zh-CN", "Dutch": "nl", "English": "en", "Esperanto": "eo", "Finnish": "fi", "French": "fr", "German": "de", "Hungarian": "hu", "Italian": "it", "Japanese": "ja", "Norwegian": "no", "Polish": "pl", "Portuguese": "pt", "Russian": "ru", "Spanish": "es", "Swedish": "sv", "Turkish": "tr"}
 tts_supported_langs = {"Arabic", "Chinese (Mandarin)", "Dutch", "English", "Finnish", "French", "German", "Hungarian", "Italian", "Japanese", "Norwegian", "Polish", "Portuguese", "Russian", "Spanish", "Swedish", "Turkish"}
+MAINTENANCE_DELAY_MS = 2 * 60 * 1000 # First background maintenance run after startup
+MAINTENANCE_INTERVAL_MS = 6 * 60 * 60 * 1000
+MAINTENANCE_IDLE_SECONDS = 3 * 60 # Automatic maintenance waits until there has been no key or mouse input for this long
+MAINTENANCE_RETRY_MS = 60 * 1000 # How often a postponed run checks again whether the user is idle
+ACTIVITY_EVENTS = {wx.wxEVT_KEY_DOWN, wx.wxEVT_LEFT_DOWN, wx.wxEVT_RIGHT_DOWN, wx.wxEVT_MIDDLE_DOWN, wx.wxEVT_MOUSEWHEEL, wx.wxEVT_MOTION}
 deepl_lang_codes = {"Arabic": "AR", "Chinese (Simplified)": "ZH", "Dutch": "NL", "English (American)": "EN-US", "English (British)": "EN-GB", "Finnish": "FI", "French": "FR", "German": "DE", "Hungarian": "HU", "Italian": "IT", "Japanese": "JA", "Norwegian": "NB", "Polish": "PL", "Portuguese (Brazilian)": "PT-BR", "Russian": "RU", "Spanish": "ES", "Swedish": "SV", "Turkish": "TR"}
 
 def load_settings():
@@ -32,6 +42,29 @@ def load_settings():
 def save_settings():
     with open('settings.json', 'w') as f: json.dump(app_settings, f, indent=4)
 
+def speak_async(text, lang_code, token=None):
+    # speak() also gets the token itself, so it can stop between sentences once the panel is gone.
+    background.submit('audio', tts_handler.speak, text, lang_code, app_settings['keep_tts_cache'], token, token=token)
+
+def memory_side(source_name, target_name):
+    """
+    Returns the translation memory column ('native' or 'learned') whose words translate from source_name
+    to target_name, or None unless the pair is the user's native and learned language in either order.
+    A None source matches either language. Names are compared without variants, e.g. DeepL's "English (British)".
+    """
+    native, learning, target = (name.split(' (')[0] for name in (app_settings['native_language'], app_settings['learning_language'], target_name))
+    source = source_name.split(' (')[0] if source_name else None
+    if target == learning and source in (None, native): return 'native'
+    if target == native and source in (None, learning): return 'learned'
+    return None
+
+def format_memory_matches(word, matches):
+    if not matches: return ""
+    output = [_("Found {count} matches for '{word}' in your dictionaries:\n").format(count=len(matches), word=word)]
+    for score, side, source, translation, dict_name in matches:
+        output.append(f"- \"{translation}\""), output.append(_("  (Your entry: {source} in {dictionary}, Match: {score}%)").format(source=source, dictionary=dict_name, score=round(score * 100)))
+    return "\n".join(output) + "\n\n"
+
 # --- Dialogs ---
 class LanguageSelectDialog(wx.Dialog):
     def __init__(self, parent):
@@ -132,15 +165,23 @@ class SettingsDialog(wx.Dialog):
 # --- All Main Panels ---
 class DatabasePanel(wx.Panel):
     def __init__(self, parent):
-        super().__init__(parent)
+        super().__init__(parent); self.token = background.panel_token(self)
         self.dictionaries, self.current_dict_id = {}, None; main_sizer, control_sizer = wx.BoxSizer(wx.VERTICAL), wx.BoxSizer(wx.HORIZONTAL); self.dict_choice, self.delete_dict_button = wx.Choice(self), wx.Button(self, label=_("Delete This Dictionary")); self.Bind(wx.EVT_CHOICE, self.on_dict_selected, self.dict_choice), self.Bind(wx.EVT_BUTTON, self.on_delete_dictionary, self.delete_dict_button); control_sizer.Add(wx.StaticText(self, label=_("Dictionary:")), 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5), control_sizer.Add(self.dict_choice, 1, wx.EXPAND | wx.RIGHT, 10), control_sizer.Add(self.delete_dict_button, 0); main_sizer.Add(control_sizer, 0, wx.EXPAND | wx.ALL, 10); self.word_list = wx.ListCtrl(self, style=wx.LC_REPORT | wx.BORDER_SUNKEN); self.word_list.InsertColumn(0, _("Native Word"), width=200), self.word_list.InsertColumn(1, _("Learned Word"), width=200), self.word_list.InsertColumn(2, _("Notes"), width=300); self.Bind(wx.EVT_LIST_ITEM_DESELECTED, self.on_word_deselected, self.word_list), self.Bind(wx.EVT_LIST_ITEM_SELECTED, self.on_word_selected, self.word_list); main_sizer.Add(self.word_list, 1, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10); button_sizer = wx.BoxSizer(wx.HORIZONTAL); self.add_button, self.edit_button, self.delete_button = wx.Button(self, label=_("Add Word...")), wx.Button(self, label=_("Edit Word...")), wx.Button(self, label=_("Delete Word")); self.speak_button = wx.Button(self, label=_("Speak Learned Word")); self.edit_button.Disable(), self.delete_button.Disable(), self.speak_button.Disable(); self.Bind(wx.EVT_BUTTON, self.on_add_word, self.add_button), self.Bind(wx.EVT_BUTTON, self.on_edit_word, self.edit_button), self.Bind(wx.EVT_BUTTON, self.on_delete_word, self.delete_button), self.Bind(wx.EVT_BUTTON, self.on_speak, self.speak_button); button_sizer.Add(self.add_button), button_sizer.Add(self.edit_button, 0, wx.LEFT, 5), button_sizer.Add(self.delete_button, 0, wx.LEFT, 5), button_sizer.AddStretchSpacer(), button_sizer.Add(self.speak_button, 0, wx.LEFT, 5); main_sizer.Add(button_sizer, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10); self.SetSizer(main_sizer), self.populate_dictionaries(); self.dict_choice.SetFocus()
     def populate_dictionaries(self):
-        self.dict_choice.Clear(), self.word_list.DeleteAllItems(), self.edit_button.Disable(), self.delete_button.Disable(), self.speak_button.Disable(); db_dicts = database.get_dictionaries(); self.dictionaries = {name: id for id, name in db_dicts}
-        if db_dicts: self.dict_choice.AppendItems([name for id, name in db_dicts]), self.dict_choice.SetSelection(0), self.on_dict_selected(None), self.delete_dict_button.Enable()
+        self.dict_choice.Clear(), self.word_list.DeleteAllItems(), self.edit_button.Disable(), self.delete_button.Disable(), self.speak_button.Disable(); db_dicts = database.get_dictionaries(); stats = database.get_dictionary_stats(); self.dict_names = {id: name for id, name in db_dicts}; self.dictionaries = {self.dict_label(id, stats): id for id, name in db_dicts}
+        if db_dicts: self.dict_choice.AppendItems(list(self.dictionaries.keys())), self.dict_choice.SetSelection(0), self.on_dict_selected(None), self.delete_dict_button.Enable()
         else: self.current_dict_id, self.add_button.Disable(), self.delete_dict_button.Disable()
+    def dict_label(self, dict_id, stats):
+        total, due = stats.get(dict_id, (0, 0))[:2]
+        return _("{name} ({due} due / {total} words)").format(name=self.dict_names[dict_id], due=due, total=total)
+    def refresh_dict_labels(self):
+        # Counts come from the materialized forecast table, so relabelling is cheap even for huge dictionaries.
+        stats = database.get_dictionary_stats(); ids = list(self.dictionaries.values()); self.dictionaries = {self.dict_label(id, stats): id for id in ids}
+        for index, label in enumerate(self.dictionaries.keys()): self.dict_choice.SetString(index, label)
     def populate_words(self):
         self.word_list.DeleteAllItems(), self.edit_button.Disable(), self.delete_button.Disable(), self.speak_button.Disable()
         if self.current_dict_id is not None:
+            self.refresh_dict_labels()
             self.add_button.Enable()
             for word_id, native, learned, notes in database.get_words(self.current_dict_id):
                 index = self.word_list.InsertItem(self.word_list.GetItemCount(), native)
@@ -150,9 +191,13 @@ class DatabasePanel(wx.Panel):
         if selected_name in self.dictionaries: self.current_dict_id = self.dictionaries[selected_name]; self.populate_words()
     def on_delete_dictionary(self, event):
         if not self.current_dict_id: return
-        dict_name = self.dict_choice.GetStringSelection()
+        dict_name = self.dict_names[self.current_dict_id]
         with wx.MessageDialog(self, _("Are you sure you want to permanently delete the entire dictionary '{name}' and all the words in it?").format(name=dict_name), _("Confirm Delete Dictionary"), wx.YES_NO | wx.NO_DEFAULT | wx.ICON_WARNING) as dlg:
-            if dlg.ShowModal() == wx.ID_YES: database.delete_dictionary(self.current_dict_id), self.populate_dictionaries()
+            if dlg.ShowModal() == wx.ID_YES:
+                # The delete outlives this panel, so progress and completion are reported to the frame. The progress
+                # callback runs on the db worker and must not touch wx, or a destroyed panel would abort the delete halfway.
+                frame = self.GetParent(); progress = lambda deleted: background.deliver(frame.token, frame.SetStatusText, _("Deleting dictionary... {count} words removed").format(count=deleted))
+                self.delete_dict_button.Disable(), background.submit('db', database.delete_dictionary, self.current_dict_id, progress, background.shutting_down, token=frame.token, on_done=frame.on_dictionary_deleted)
     def on_word_selected(self, event):
         self.edit_button.Enable()
         self.delete_button.Enable()
@@ -170,15 +215,15 @@ class DatabasePanel(wx.Panel):
         if (idx := self.word_list.GetFirstSelected()) == -1: return
         word_id, native_word = self.word_list.GetItemData(idx), self.word_list.GetItemText(idx)
         with wx.MessageDialog(self, _("Are you sure you want to delete the word '{word}'?").format(word=native_word), _("Confirm Delete"), wx.YES_NO | wx.NO_DEFAULT | wx.ICON_WARNING) as dlg:
-            if dlg.ShowModal() == wx.ID_YES: database.delete_word(word_id), self.populate_words()
+            if dlg.ShowModal() == wx.ID_YES: self.delete_button.Disable(), background.submit('db', database.delete_word, word_id, token=self.token, on_done=lambda result: self.populate_words())
     def on_speak(self, event):
         if (idx := self.word_list.GetFirstSelected()) == -1: return
         learned_word, lang_code = self.word_list.GetItem(idx, 1).GetText(), lang_codes.get(app_settings['learning_language'])
-        if learned_word and lang_code: threading.Thread(target=tts_handler.speak, args=(learned_word, lang_code, app_settings['keep_tts_cache']), daemon=True).start()
+        if learned_word and lang_code: speak_async(learned_word, lang_code, self.token)
 
 class ReviewPanel(wx.Panel): # ... (code is unchanged)
     def __init__(self, parent):
-        super().__init__(parent); self.due_cards, self.current_card = [], None; main_sizer, review_box = wx.BoxSizer(wx.VERTICAL), wx.StaticBox(self, label=_("Review Due Words")); sizer = wx.StaticBoxSizer(review_box, wx.VERTICAL); self.card_count_text, self.question_text = wx.StaticText(self, label=""), wx.StaticText(self, label=_("Loading...")); self.question_text.SetFont(wx.Font(36, wx.DEFAULT, wx.NORMAL, wx.BOLD)); self.show_answer_button = wx.Button(self, label=_("Show Answer")); self.Bind(wx.EVT_BUTTON, self.on_show_answer, self.show_answer_button); sizer.Add(self.card_count_text, 0, wx.ALL | wx.ALIGN_CENTER, 10), sizer.Add(self.question_text, 1, wx.EXPAND | wx.ALL, 20), sizer.Add(self.show_answer_button, 0, wx.EXPAND | wx.ALL, 10); main_sizer.Add(sizer, 1, wx.EXPAND | wx.ALL, 20), self.SetSizer(main_sizer), self.start_review_session(); self.show_answer_button.SetFocus()
+        super().__init__(parent); self.token = background.panel_token(self); self.due_cards, self.current_card = [], None; main_sizer, review_box = wx.BoxSizer(wx.VERTICAL), wx.StaticBox(self, label=_("Review Due Words")); sizer = wx.StaticBoxSizer(review_box, wx.VERTICAL); self.card_count_text, self.question_text = wx.StaticText(self, label=""), wx.StaticText(self, label=_("Loading...")); self.question_text.SetFont(wx.Font(36, wx.DEFAULT, wx.NORMAL, wx.BOLD)); self.show_answer_button = wx.Button(self, label=_("Show Answer")); self.Bind(wx.EVT_BUTTON, self.on_show_answer, self.show_answer_button); sizer.Add(self.card_count_text, 0, wx.ALL | wx.ALIGN_CENTER, 10), sizer.Add(self.question_text, 1, wx.EXPAND | wx.ALL, 20), sizer.Add(self.show_answer_button, 0, wx.EXPAND | wx.ALL, 10); main_sizer.Add(sizer, 1, wx.EXPAND | wx.ALL, 20), self.SetSizer(main_sizer), self.start_review_session(); self.show_answer_button.SetFocus()
     def start_review_session(self):
         self.due_cards = database.get_due_cards()
         if not self.due_cards: wx.MessageBox(_("No words are due for review today. Great job!"), _("Review Complete"), wx.OK | wx.ICON_INFORMATION), wx.CallAfter(self.GetParent().show_database_panel)
@@ -190,11 +235,11 @@ class ReviewPanel(wx.Panel): # ... (code is unchanged)
         self.question_text.SetLabel(native)
         self.card_count_text.SetLabel(_("{count} words remaining.").format(count=len(self.due_cards) + 1))
         self.Layout()
-        if app_settings['native_language'] in tts_supported_langs and (lang_code := lang_codes.get(app_settings['native_language'])): threading.Thread(target=tts_handler.speak, args=(native, lang_code, app_settings['keep_tts_cache']), daemon=True).start()
+        if app_settings['native_language'] in tts_supported_langs and (lang_code := lang_codes.get(app_settings['native_language'])): speak_async(native, lang_code, self.token)
     def on_show_answer(self, event):
         word_id, native, learned, easiness, interval, _ = self.current_card
         wx.MessageBox(_("The answer is:\n\n{answer}").format(answer=learned), _("Answer"), wx.OK | wx.ICON_INFORMATION)
-        if app_settings['learning_language'] in tts_supported_langs and (lang_code := lang_codes.get(app_settings['learning_language'])): threading.Thread(target=tts_handler.speak, args=(learned, lang_code, app_settings['keep_tts_cache']), daemon=True).start()
+        if app_settings['learning_language'] in tts_supported_langs and (lang_code := lang_codes.get(app_settings['learning_language'])): speak_async(learned, lang_code, self.token)
         choices = [_("Forgot (review in 1 day)"), _("Hard"), _("Good"), _("Easy")]
         with wx.SingleChoiceDialog(self, _("How well did you know it?"), _("Grade Yourself"), choices) as grade_dlg:
             if grade_dlg.ShowModal() == wx.ID_OK:
@@ -206,12 +251,12 @@ class ReviewPanel(wx.Panel): # ... (code is unchanged)
                     elif quality == 4: interval = round(interval * easiness)
                     elif quality == 5: interval = round(interval * easiness * 1.3)
                     if interval == 0: interval = 1
-                database.update_word_srs(word_id, easiness, interval, date.today() + timedelta(days=interval))
+                background.submit('db', database.update_word_srs, word_id, easiness, interval, date.today() + timedelta(days=interval))
         self.load_next_card()
 
 class QuizPanel(wx.Panel): # ... (code is unchanged)
     def __init__(self, parent):
-        super().__init__(parent); self.session_words, self.incorrect_words, self.state, self.current_q_num = [], [], 'quiz', 0; self.current_question, self.current_answer = None, None; main_sizer, self.quiz_box = wx.BoxSizer(wx.VERTICAL), wx.StaticBox(self, label=_("Quiz")); quiz_sizer = wx.StaticBoxSizer(self.quiz_box, wx.VERTICAL); question_sizer = wx.BoxSizer(wx.HORIZONTAL); self.question_text = wx.StaticText(self, label="", style=wx.ALIGN_CENTER); self.question_text.SetFont(wx.Font(24, wx.DEFAULT, wx.NORMAL, wx.BOLD)); self.speak_button = wx.Button(self, label=_("Speak")); question_sizer.Add(self.question_text, 1, wx.ALIGN_CENTER_VERTICAL), question_sizer.Add(self.speak_button, 0, wx.ALIGN_CENTER_VERTICAL | wx.LEFT, 10); self.answer_input = wx.TextCtrl(self, style=wx.TE_PROCESS_ENTER); self.Bind(wx.EVT_TEXT_ENTER, self.on_check_answer, self.answer_input); self.check_button, self.close_button = wx.Button(self, label=_("Check Answer")), wx.Button(self, label=_("End Quiz Early")); self.Bind(wx.EVT_BUTTON, self.on_check_answer, self.check_button), self.Bind(wx.EVT_BUTTON, self.on_speak, self.speak_button), self.Bind(wx.EVT_BUTTON, lambda e: self.GetParent().show_database_panel(), self.close_button); button_sizer = wx.BoxSizer(wx.HORIZONTAL); button_sizer.Add(self.check_button, 0, wx.RIGHT, 5), button_sizer.Add(self.close_button, 0, wx.LEFT, 5); quiz_sizer.Add(wx.StaticText(self, label=_("Translate the following:")), 0, wx.ALL, 10), quiz_sizer.Add(question_sizer, 0, wx.EXPAND | wx.ALL, 10), quiz_sizer.Add(self.answer_input, 0, wx.EXPAND | wx.ALL, 10), quiz_sizer.Add(button_sizer, 0, wx.CENTER | wx.ALL, 10); main_sizer.Add(quiz_sizer, 0, wx.EXPAND | wx.ALL, 20), self.SetSizerAndFit(main_sizer), self.start_session(); self.answer_input.SetFocus()
+        super().__init__(parent); self.token = background.panel_token(self); self.session_words, self.incorrect_words, self.state, self.current_q_num = [], [], 'quiz', 0; self.current_question, self.current_answer = None, None; main_sizer, self.quiz_box = wx.BoxSizer(wx.VERTICAL), wx.StaticBox(self, label=_("Quiz")); quiz_sizer = wx.StaticBoxSizer(self.quiz_box, wx.VERTICAL); question_sizer = wx.BoxSizer(wx.HORIZONTAL); self.question_text = wx.StaticText(self, label="", style=wx.ALIGN_CENTER); self.question_text.SetFont(wx.Font(24, wx.DEFAULT, wx.NORMAL, wx.BOLD)); self.speak_button = wx.Button(self, label=_("Speak")); question_sizer.Add(self.question_text, 1, wx.ALIGN_CENTER_VERTICAL), question_sizer.Add(self.speak_button, 0, wx.ALIGN_CENTER_VERTICAL | wx.LEFT, 10); self.answer_input = wx.TextCtrl(self, style=wx.TE_PROCESS_ENTER); self.Bind(wx.EVT_TEXT_ENTER, self.on_check_answer, self.answer_input); self.check_button, self.close_button = wx.Button(self, label=_("Check Answer")), wx.Button(self, label=_("End Quiz Early")); self.Bind(wx.EVT_BUTTON, self.on_check_answer, self.check_button), self.Bind(wx.EVT_BUTTON, self.on_speak, self.speak_button), self.Bind(wx.EVT_BUTTON, lambda e: self.GetParent().show_database_panel(), self.close_button); button_sizer = wx.BoxSizer(wx.HORIZONTAL); button_sizer.Add(self.check_button, 0, wx.RIGHT, 5), button_sizer.Add(self.close_button, 0, wx.LEFT, 5); quiz_sizer.Add(wx.StaticText(self, label=_("Translate the following:")), 0, wx.ALL, 10), quiz_sizer.Add(question_sizer, 0, wx.EXPAND | wx.ALL, 10), quiz_sizer.Add(self.answer_input, 0, wx.EXPAND | wx.ALL, 10), quiz_sizer.Add(button_sizer, 0, wx.CENTER | wx.ALL, 10); main_sizer.Add(quiz_sizer, 0, wx.EXPAND | wx.ALL, 20), self.SetSizerAndFit(main_sizer), self.start_session(); self.answer_input.SetFocus()
     def start_session(self):
         self.session_words = database.get_random_words(20)
         if not self.session_words: wx.MessageBox(_("Not enough words in database for a quiz."), _("Quiz Empty"), wx.OK | wx.ICON_INFORMATION), wx.CallAfter(self.GetParent().show_database_panel); return
@@ -243,11 +288,11 @@ class QuizPanel(wx.Panel): # ... (code is unchanged)
         lang_to_speak = app_settings['native_language'] if self.question_is_native else app_settings['learning_language']
         if self.current_question and lang_to_speak in tts_supported_langs:
             lang_code = lang_codes.get(lang_to_speak)
-            threading.Thread(target=tts_handler.speak, args=(self.current_question, lang_code, app_settings['keep_tts_cache']), daemon=True).start()
+            speak_async(self.current_question, lang_code, self.token)
 
 class FlashcardPanel(wx.Panel):
     def __init__(self, parent):
-        super().__init__(parent); self.session_words, self.current_answer, self.current_index = [], "", 0; main_sizer, fc_box = wx.BoxSizer(wx.VERTICAL), wx.StaticBox(self, label=_("Flashcards")); sizer = wx.StaticBoxSizer(fc_box, wx.VERTICAL); self.card_count_text, self.word_text = wx.StaticText(self, label=""), wx.StaticText(self, label="", style=wx.ALIGN_CENTER); self.word_text.SetFont(wx.Font(36, wx.DEFAULT, wx.NORMAL, wx.BOLD)); self.show_answer_button, self.close_button = wx.Button(self, label=_("Show Answer")), wx.Button(self, label=_("End Session")); self.Bind(wx.EVT_BUTTON, self.on_show_answer, self.show_answer_button), self.Bind(wx.EVT_BUTTON, lambda e: self.GetParent().show_database_panel(), self.close_button); sizer.Add(self.card_count_text, 0, wx.ALL | wx.ALIGN_CENTER, 10), sizer.Add(self.word_text, 1, wx.EXPAND | wx.ALL, 20), sizer.Add(self.show_answer_button, 0, wx.EXPAND | wx.ALL, 10), sizer.Add(self.close_button, 0, wx.ALIGN_CENTER | wx.TOP, 10); main_sizer.Add(sizer, 1, wx.EXPAND | wx.ALL, 20), self.SetSizer(main_sizer), self.start_session(); self.show_answer_button.SetFocus()
+        super().__init__(parent); self.token = background.panel_token(self); self.session_words, self.current_answer, self.current_index = [], "", 0; main_sizer, fc_box = wx.BoxSizer(wx.VERTICAL), wx.StaticBox(self, label=_("Flashcards")); sizer = wx.StaticBoxSizer(fc_box, wx.VERTICAL); self.card_count_text, self.word_text = wx.StaticText(self, label=""), wx.StaticText(self, label="", style=wx.ALIGN_CENTER); self.word_text.SetFont(wx.Font(36, wx.DEFAULT, wx.NORMAL, wx.BOLD)); self.show_answer_button, self.close_button = wx.Button(self, label=_("Show Answer")), wx.Button(self, label=_("End Session")); self.Bind(wx.EVT_BUTTON, self.on_show_answer, self.show_answer_button), self.Bind(wx.EVT_BUTTON, lambda e: self.GetParent().show_database_panel(), self.close_button); sizer.Add(self.card_count_text, 0, wx.ALL | wx.ALIGN_CENTER, 10), sizer.Add(self.word_text, 1, wx.EXPAND | wx.ALL, 20), sizer.Add(self.show_answer_button, 0, wx.EXPAND | wx.ALL, 10), sizer.Add(self.close_button, 0, wx.ALIGN_CENTER | wx.TOP, 10); main_sizer.Add(sizer, 1, wx.EXPAND | wx.ALL, 20), self.SetSizer(main_sizer), self.start_session(); self.show_answer_button.SetFocus()
     def start_session(self):
         self.session_words = database.get_random_words(15)
         if not self.session_words: wx.MessageBox(_("No words in database for flashcards."), _("Empty"), wx.OK | wx.ICON_INFORMATION), wx.CallAfter(self.GetParent().show_database_panel); return
@@ -266,40 +311,49 @@ class FlashcardPanel(wx.Panel):
         self.Layout()
         if question and lang_to_speak in tts_supported_langs:
             lang_code = lang_codes.get(lang_to_speak)
-            threading.Thread(target=tts_handler.speak, args=(question, lang_code, app_settings['keep_tts_cache']), daemon=True).start()
+            speak_async(question, lang_code, self.token)
     def on_show_answer(self, event): wx.MessageBox(_("The answer is:\n\n{answer}").format(answer=self.current_answer), _("Answer"), wx.OK | wx.ICON_INFORMATION), self.load_next_card()
 
 class OnlineDictPanel(wx.Panel):
     def __init__(self, parent):
-        super().__init__(parent); self.last_search_term, self.last_best_translation = None, None; main_sizer, lang_sizer = wx.BoxSizer(wx.VERTICAL), wx.BoxSizer(wx.HORIZONTAL); self.english_lang_map = {get_translated_lang_name(name): name for name in lang_codes.keys()}; all_langs_sorted = sorted(list(self.english_lang_map.keys())); self.source_lang_choice, self.target_lang_choice = wx.Choice(self, choices=all_langs_sorted), wx.Choice(self, choices=all_langs_sorted); self.source_lang_choice.SetStringSelection(get_translated_lang_name(app_settings['native_language'])), self.target_lang_choice.SetStringSelection(get_translated_lang_name(app_settings['learning_language'])); lang_sizer.Add(wx.StaticText(self, label=_("From:")), 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5), lang_sizer.Add(self.source_lang_choice, 1, wx.EXPAND | wx.RIGHT, 10), lang_sizer.Add(wx.StaticText(self, label=_("To:")), 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5), lang_sizer.Add(self.target_lang_choice, 1, wx.EXPAND); search_box = wx.StaticBox(self, label=_("&Word to Translate")); search_sizer = wx.StaticBoxSizer(search_box, wx.HORIZONTAL); self.search_input, self.search_button = wx.TextCtrl(self, style=wx.TE_PROCESS_ENTER), wx.Button(self, label=_("Translate")); search_sizer.Add(self.search_input, 1, wx.EXPAND | wx.RIGHT, 5), search_sizer.Add(self.search_button, 0); self.Bind(wx.EVT_BUTTON, self.on_search, self.search_button), self.Bind(wx.EVT_TEXT_ENTER, self.on_search, self.search_input); self.results_text = wx.TextCtrl(self, style=wx.TE_MULTILINE | wx.TE_READONLY | wx.TE_RICH2); self.results_text.SetFont(wx.Font(11, wx.FONTFAMILY_TELETYPE, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL)); button_sizer = wx.BoxSizer(wx.HORIZONTAL); self.add_to_db_button, self.speak_button, self.close_button = wx.Button(self, label=_("Add to Database...")), wx.Button(self, label=_("Speak Translation")), wx.Button(self, label=_("Close")); button_sizer.Add(self.add_to_db_button), button_sizer.Add(self.speak_button, 0, wx.LEFT, 10), button_sizer.AddStretchSpacer(), button_sizer.Add(self.close_button); self.add_to_db_button.Disable(), self.speak_button.Disable(); self.Bind(wx.EVT_BUTTON, self.on_add_to_db, self.add_to_db_button), self.Bind(wx.EVT_BUTTON, self.on_speak, self.speak_button), self.Bind(wx.EVT_BUTTON, lambda e: self.GetParent().show_database_panel(), self.close_button); main_sizer.Add(lang_sizer, 0, wx.EXPAND | wx.ALL, 10), main_sizer.Add(search_sizer, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10), main_sizer.Add(self.results_text, 1, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10), main_sizer.Add(button_sizer, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10); self.SetSizer(main_sizer), self.search_input.SetFocus()
-    def on_search(self, event):
+        super().__init__(parent); self.token = background.panel_token(self); self.last_search_term, self.last_best_translation, self.memory_text = None, None, ""; main_sizer, lang_sizer = wx.BoxSizer(wx.VERTICAL), wx.BoxSizer(wx.HORIZONTAL); self.english_lang_map = {get_translated_lang_name(name): name for name in lang_codes.keys()}; all_langs_sorted = sorted(list(self.english_lang_map.keys())); self.source_lang_choice, self.target_lang_choice = wx.Choice(self, choices=all_langs_sorted), wx.Choice(self, choices=all_langs_sorted); self.source_lang_choice.SetStringSelection(get_translated_lang_name(app_settings['native_language'])), self.target_lang_choice.SetStringSelection(get_translated_lang_name(app_settings['learning_language'])); lang_sizer.Add(wx.StaticText(self, label=_("From:")), 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5), lang_sizer.Add(self.source_lang_choice, 1, wx.EXPAND | wx.RIGHT, 10), lang_sizer.Add(wx.StaticText(self, label=_("To:")), 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5), lang_sizer.Add(self.target_lang_choice, 1, wx.EXPAND); search_box = wx.StaticBox(self, label=_("&Word to Translate")); search_sizer = wx.StaticBoxSizer(search_box, wx.HORIZONTAL); self.search_input, self.search_button, self.search_online_button = wx.TextCtrl(self, style=wx.TE_PROCESS_ENTER), wx.Button(self, label=_("Translate")), wx.Button(self, label=_("Search &Online")); search_sizer.Add(self.search_input, 1, wx.EXPAND | wx.RIGHT, 5), search_sizer.Add(self.search_button, 0), search_sizer.Add(self.search_online_button, 0, wx.LEFT, 5); self.Bind(wx.EVT_BUTTON, self.on_search, self.search_button), self.Bind(wx.EVT_BUTTON, lambda e: self.on_search(e, online=True), self.search_online_button), self.Bind(wx.EVT_TEXT_ENTER, self.on_search, self.search_input); self.results_text = wx.TextCtrl(self, style=wx.TE_MULTILINE | wx.TE_READONLY | wx.TE_RICH2); self.results_text.SetFont(wx.Font(11, wx.FONTFAMILY_TELETYPE, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL)); button_sizer = wx.BoxSizer(wx.HORIZONTAL); self.add_to_db_button, self.speak_button, self.close_button = wx.Button(self, label=_("Add to Database...")), wx.Button(self, label=_("Speak Translation")), wx.Button(self, label=_("Close")); button_sizer.Add(self.add_to_db_button), button_sizer.Add(self.speak_button, 0, wx.LEFT, 10), button_sizer.AddStretchSpacer(), button_sizer.Add(self.close_button); self.add_to_db_button.Disable(), self.speak_button.Disable(); self.Bind(wx.EVT_BUTTON, self.on_add_to_db, self.add_to_db_button), self.Bind(wx.EVT_BUTTON, self.on_speak, self.speak_button), self.Bind(wx.EVT_BUTTON, lambda e: self.GetParent().show_database_panel(), self.close_button); main_sizer.Add(lang_sizer, 0, wx.EXPAND | wx.ALL, 10), main_sizer.Add(search_sizer, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10), main_sizer.Add(self.results_text, 1, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10), main_sizer.Add(button_sizer, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10); self.SetSizer(main_sizer), self.search_input.SetFocus()
+    def on_search(self, event, online=False):
         word, source_name_t, target_name_t = self.search_input.GetValue().strip(), self.source_lang_choice.GetStringSelection(), self.target_lang_choice.GetStringSelection()
         source_name, target_name = self.english_lang_map[source_name_t], self.english_lang_map[target_name_t]
         if not word: return
-        self.search_button.Disable(), self.add_to_db_button.Disable(), self.speak_button.Disable()
+        self.search_button.Disable(), self.search_online_button.Disable(), self.add_to_db_button.Disable(), self.speak_button.Disable()
         self.last_search_term, self.last_best_translation = None, None
-        self.results_text.SetValue(_("Translating '{word}' from {source} to {target}...").format(word=word, source=source_name_t, target=target_name_t)), self.GetParent().SetStatusText(_("Translating {word}...").format(word=word))
-        threading.Thread(target=self._get_advanced_translation, args=(word, source_name, target_name), daemon=True).start()
+        # Check the user's own dictionaries first. Only a native/learned language pair can be answered from them
+        # without going online; for any other pair the matches are just shown as hints next to the online results.
+        # The lookup runs on the db worker, so a large dictionary never freezes the window.
+        side = 'native' if source_name == app_settings['native_language'] else 'learned' if source_name == app_settings['learning_language'] else None
+        on_matches = lambda matches: self.on_memory_matches(matches, word, source_name, target_name, online)
+        self.GetParent().SetStatusText(_("Searching your dictionaries...")), background.submit('db', translation_memory.lookup, word, side, token=self.token, on_done=on_matches, on_error=lambda e: (print(f"Translation memory lookup failed: {e}"), on_matches([])))
+    def on_memory_matches(self, matches, word, source_name, target_name, online):
+        self.memory_text = format_memory_matches(word, matches)
+        if not online and (answer_side := memory_side(source_name, target_name)) and (exact := translation_memory.best_exact(matches, answer_side)): self._update_results(_("Use \"Search Online\" to also ask the online translator."), word, exact[3]); return
+        self.results_text.SetValue(_("Translating '{word}' from {source} to {target}...").format(word=word, source=get_translated_lang_name(source_name), target=get_translated_lang_name(target_name))), self.GetParent().SetStatusText(_("Translating {word}...").format(word=word))
+        if background.submit('network', self._get_advanced_translation, word, source_name, target_name, token=self.token) is None: self._update_results(_("Too many requests are in progress. Please try again in a moment."))
     def _get_advanced_translation(self, word, source_name, target_name):
         try:
             source_code, target_code = lang_codes.get(source_name), lang_codes.get(target_name)
-            if not (source_code and target_code): wx.CallAfter(self._update_results, _("Error: Language not configured.")); return
+            if not (source_code and target_code): background.deliver(self.token, self._update_results, _("Error: Language not configured.")); return
             encoded_word = urllib.parse.quote(word)
             url = f"https://api.mymemory.translated.net/get?q={encoded_word}&langpair={source_code}|{target_code}"
             response = requests.get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
-            if data['responseStatus'] != 200: wx.CallAfter(self._update_results, _("API Error: {details}").format(details=data.get('responseDetails', 'Unknown error')))
+            if data['responseStatus'] != 200: background.deliver(self.token, self._update_results, _("API Error: {details}").format(details=data.get('responseDetails', 'Unknown error')))
             else:
                 output = [_("Found {count} translation matches for '{word}':\n").format(count=len(data['matches']), word=word)]
                 best_translation = data['responseData']['translatedText']
                 for match in data['matches']:
                     output.append(f"- \"{match.get('translation', 'N/A')}\""), output.append(f"  (Source: {match.get('source', 'N/A')}, Quality: {int(float(match.get('quality', 0)) * 100)}%)")
-                wx.CallAfter(self._update_results, "\n".join(output), word, best_translation)
-        except requests.exceptions.RequestException as e: wx.CallAfter(self._update_results, _("A network error occurred:\n{error}").format(error=e))
-        except Exception as e: wx.CallAfter(self._update_results, _("A critical error occurred:\n\n{type}: {error}").format(type=type(e).__name__, error=e))
+                background.deliver(self.token, self._update_results, "\n".join(output), word, best_translation)
+        except requests.exceptions.RequestException as e: background.deliver(self.token, self._update_results, _("A network error occurred:\n{error}").format(error=e))
+        except Exception as e: background.deliver(self.token, self._update_results, _("A critical error occurred:\n\n{type}: {error}").format(type=type(e).__name__, error=e))
     def _update_results(self, text, original_word=None, best_translation=None):
-        self.results_text.SetValue(text), self.search_button.Enable(), self.GetParent().SetStatusText(_("Translation complete."))
+        self.results_text.SetValue(self.memory_text + text), self.search_button.Enable(), self.search_online_button.Enable(), self.GetParent().SetStatusText(_("Translation complete."))
         if original_word and best_translation:
             self.last_search_term, self.last_best_translation = original_word, best_translation
             self.add_to_db_button.Enable()
@@ -313,47 +367,54 @@ class OnlineDictPanel(wx.Panel):
     def on_speak(self, event):
         target_lang = self.english_lang_map[self.target_lang_choice.GetStringSelection()]
         if self.last_best_translation and (lang_code := lang_codes.get(target_lang)):
-            threading.Thread(target=tts_handler.speak, args=(self.last_best_translation, lang_code, app_settings['keep_tts_cache']), daemon=True).start()
+            speak_async(self.last_best_translation, lang_code, self.token)
 
 class PronunciationPanel(wx.Panel):
     def __init__(self, parent):
-        super().__init__(parent); main_sizer = wx.BoxSizer(wx.VERTICAL); practice_box = wx.StaticBox(self, label=_("Practice Pronunciation in {lang}").format(lang=app_settings['learning_language'])); sizer = wx.StaticBoxSizer(practice_box, wx.VERTICAL); self.text_input = wx.TextCtrl(self, style=wx.TE_MULTILINE | wx.TE_PROCESS_ENTER); self.text_input.SetHint(_("Type or paste any text here to practice...")); self.speak_button, self.close_button = wx.Button(self, label=_("Speak Text")), wx.Button(self, label=_("Close")); self.Bind(wx.EVT_BUTTON, self.on_speak, self.speak_button), self.Bind(wx.EVT_BUTTON, lambda e: self.GetParent().show_database_panel(), self.close_button); sizer.Add(self.text_input, 1, wx.EXPAND | wx.ALL, 10), sizer.Add(self.speak_button, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10), sizer.Add(self.close_button, 0, wx.ALIGN_CENTER | wx.BOTTOM, 10); main_sizer.Add(sizer, 1, wx.EXPAND | wx.ALL, 20), self.SetSizer(main_sizer), self.text_input.SetFocus()
+        super().__init__(parent); self.token = background.panel_token(self); main_sizer = wx.BoxSizer(wx.VERTICAL); practice_box = wx.StaticBox(self, label=_("Practice Pronunciation in {lang}").format(lang=app_settings['learning_language'])); sizer = wx.StaticBoxSizer(practice_box, wx.VERTICAL); self.text_input = wx.TextCtrl(self, style=wx.TE_MULTILINE | wx.TE_PROCESS_ENTER); self.text_input.SetHint(_("Type or paste any text here to practice...")); self.speak_button, self.close_button = wx.Button(self, label=_("Speak Text")), wx.Button(self, label=_("Close")); self.Bind(wx.EVT_BUTTON, self.on_speak, self.speak_button), self.Bind(wx.EVT_BUTTON, lambda e: self.GetParent().show_database_panel(), self.close_button); sizer.Add(self.text_input, 1, wx.EXPAND | wx.ALL, 10), sizer.Add(self.speak_button, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10), sizer.Add(self.close_button, 0, wx.ALIGN_CENTER | wx.BOTTOM, 10); main_sizer.Add(sizer, 1, wx.EXPAND | wx.ALL, 20), self.SetSizer(main_sizer), self.text_input.SetFocus()
         if app_settings['learning_language'] not in tts_supported_langs: self.speak_button.Disable()
     def on_speak(self, event):
         text, lang_name = self.text_input.GetValue().strip(), app_settings['learning_language']
         lang_code = lang_codes.get(lang_name)
-        if text and lang_code: threading.Thread(target=tts_handler.speak, args=(text, lang_code, app_settings['keep_tts_cache']), daemon=True).start()
+        if text and lang_code: speak_async(text, lang_code, self.token)
         elif not text: wx.MessageBox(_("Please enter some text to speak."), _("Input Required"), wx.OK | wx.ICON_INFORMATION)
 
 class DeepLPanel(wx.Panel):
     def __init__(self, parent):
-        super().__init__(parent); self.translator = None
+        super().__init__(parent); self.token = background.panel_token(self); self.translator = None
         if app_settings.get('deepl_api_key'):
             try: self.translator = deepl.Translator(app_settings['deepl_api_key'])
             except Exception as e: wx.MessageBox(f"Could not initialize DeepL translator. Please check your API key.\n\nError: {e}", "DeepL Error", wx.OK | wx.ICON_ERROR)
-        self.last_search_term, self.last_best_translation = None, None; main_sizer, lang_sizer = wx.BoxSizer(wx.VERTICAL), wx.BoxSizer(wx.HORIZONTAL); self.english_lang_map = {get_translated_lang_name(name): name for name in deepl_lang_codes.keys()}; deepl_langs_sorted = sorted(list(self.english_lang_map.keys())); self.target_lang_choice = wx.Choice(self, choices=deepl_langs_sorted)
+        self.last_search_term, self.last_best_translation, self.memory_text = None, None, ""; main_sizer, lang_sizer = wx.BoxSizer(wx.VERTICAL), wx.BoxSizer(wx.HORIZONTAL); self.english_lang_map = {get_translated_lang_name(name): name for name in deepl_lang_codes.keys()}; deepl_langs_sorted = sorted(list(self.english_lang_map.keys())); self.target_lang_choice = wx.Choice(self, choices=deepl_langs_sorted)
         try: self.target_lang_choice.SetStringSelection(get_translated_lang_name(app_settings['learning_language']))
         except: self.target_lang_choice.SetSelection(0)
-        lang_sizer.Add(wx.StaticText(self, label=_("Translate To:")), 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5), lang_sizer.Add(self.target_lang_choice, 1, wx.EXPAND); search_box = wx.StaticBox(self, label=_("&Word to Translate (Source language is auto-detected)")); search_sizer = wx.StaticBoxSizer(search_box, wx.HORIZONTAL); self.search_input, self.search_button = wx.TextCtrl(self, style=wx.TE_PROCESS_ENTER), wx.Button(self, label=_("Translate")); search_sizer.Add(self.search_input, 1, wx.EXPAND | wx.RIGHT, 5), search_sizer.Add(self.search_button, 0); self.Bind(wx.EVT_BUTTON, self.on_search, self.search_button), self.Bind(wx.EVT_TEXT_ENTER, self.on_search, self.search_input); self.results_text = wx.TextCtrl(self, style=wx.TE_MULTILINE | wx.TE_READONLY | wx.TE_RICH2); self.results_text.SetFont(wx.Font(11, wx.FONTFAMILY_TELETYPE, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL)); button_sizer = wx.BoxSizer(wx.HORIZONTAL); self.add_to_db_button, self.speak_button, self.close_button = wx.Button(self, label=_("Add to Database...")), wx.Button(self, label=_("Speak Translation")), wx.Button(self, label=_("Close")); button_sizer.Add(self.add_to_db_button), button_sizer.Add(self.speak_button, 0, wx.LEFT, 10), button_sizer.AddStretchSpacer(), button_sizer.Add(self.close_button); self.add_to_db_button.Disable(), self.speak_button.Disable(); self.Bind(wx.EVT_BUTTON, self.on_add_to_db, self.add_to_db_button), self.Bind(wx.EVT_BUTTON, self.on_speak, self.speak_button), self.Bind(wx.EVT_BUTTON, lambda e: self.GetParent().show_database_panel(), self.close_button); main_sizer.Add(lang_sizer, 0, wx.EXPAND | wx.ALL, 10), main_sizer.Add(search_sizer, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10), main_sizer.Add(self.results_text, 1, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10), main_sizer.Add(button_sizer, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10); self.SetSizer(main_sizer), self.search_input.SetFocus()
-        if not self.translator: self.search_input.Disable(), self.search_button.Disable(), self.results_text.SetValue(_("DeepL requires an API key. Please add it in the Settings menu."))
-    def on_search(self, event):
+        lang_sizer.Add(wx.StaticText(self, label=_("Translate To:")), 0, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5), lang_sizer.Add(self.target_lang_choice, 1, wx.EXPAND); search_box = wx.StaticBox(self, label=_("&Word to Translate (Source language is auto-detected)")); search_sizer = wx.StaticBoxSizer(search_box, wx.HORIZONTAL); self.search_input, self.search_button, self.search_online_button = wx.TextCtrl(self, style=wx.TE_PROCESS_ENTER), wx.Button(self, label=_("Translate")), wx.Button(self, label=_("Search &Online")); search_sizer.Add(self.search_input, 1, wx.EXPAND | wx.RIGHT, 5), search_sizer.Add(self.search_button, 0), search_sizer.Add(self.search_online_button, 0, wx.LEFT, 5); self.Bind(wx.EVT_BUTTON, self.on_search, self.search_button), self.Bind(wx.EVT_BUTTON, lambda e: self.on_search(e, online=True), self.search_online_button), self.Bind(wx.EVT_TEXT_ENTER, self.on_search, self.search_input); self.results_text = wx.TextCtrl(self, style=wx.TE_MULTILINE | wx.TE_READONLY | wx.TE_RICH2); self.results_text.SetFont(wx.Font(11, wx.FONTFAMILY_TELETYPE, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL)); button_sizer = wx.BoxSizer(wx.HORIZONTAL); self.add_to_db_button, self.speak_button, self.close_button = wx.Button(self, label=_("Add to Database...")), wx.Button(self, label=_("Speak Translation")), wx.Button(self, label=_("Close")); button_sizer.Add(self.add_to_db_button), button_sizer.Add(self.speak_button, 0, wx.LEFT, 10), button_sizer.AddStretchSpacer(), button_sizer.Add(self.close_button); self.add_to_db_button.Disable(), self.speak_button.Disable(); self.Bind(wx.EVT_BUTTON, self.on_add_to_db, self.add_to_db_button), self.Bind(wx.EVT_BUTTON, self.on_speak, self.speak_button), self.Bind(wx.EVT_BUTTON, lambda e: self.GetParent().show_database_panel(), self.close_button); main_sizer.Add(lang_sizer, 0, wx.EXPAND | wx.ALL, 10), main_sizer.Add(search_sizer, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10), main_sizer.Add(self.results_text, 1, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10), main_sizer.Add(button_sizer, 0, wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, 10); self.SetSizer(main_sizer), self.search_input.SetFocus()
+        if not self.translator: self.search_input.Disable(), self.search_button.Disable(), self.search_online_button.Disable(), self.results_text.SetValue(_("DeepL requires an API key. Please add it in the Settings menu."))
+    def on_search(self, event, online=False):
         word = self.search_input.GetValue().strip()
         if not word or not self.translator: return
         target_name_t = self.target_lang_choice.GetStringSelection()
         target_name = self.english_lang_map[target_name_t]
-        self.search_button.Disable(), self.add_to_db_button.Disable(), self.speak_button.Disable()
+        self.search_button.Disable(), self.search_online_button.Disable(), self.add_to_db_button.Disable(), self.speak_button.Disable()
         self.last_search_term, self.last_best_translation = None, None
-        self.results_text.SetValue(_("Translating '{word}' to {target}...").format(word=word, target=target_name_t)), self.GetParent().SetStatusText(_("Translating {word}...").format(word=word))
-        threading.Thread(target=self._get_deepl_translation, args=(word, target_name), daemon=True).start()
+        # The source language is auto-detected, so look the word up in both directions. An exact hit saves DeepL quota,
+        # but only if the target is one of the user's languages and the word was found in the other one.
+        on_matches = lambda matches: self.on_memory_matches(matches, word, target_name, online)
+        self.GetParent().SetStatusText(_("Searching your dictionaries...")), background.submit('db', translation_memory.lookup, word, token=self.token, on_done=on_matches, on_error=lambda e: (print(f"Translation memory lookup failed: {e}"), on_matches([])))
+    def on_memory_matches(self, matches, word, target_name, online):
+        self.memory_text = format_memory_matches(word, matches)
+        if not online and (answer_side := memory_side(None, target_name)) and (exact := translation_memory.best_exact(matches, answer_side)): self._update_results(_("Use \"Search Online\" to also ask the online translator."), word, exact[3]); return
+        self.results_text.SetValue(_("Translating '{word}' to {target}...").format(word=word, target=get_translated_lang_name(target_name))), self.GetParent().SetStatusText(_("Translating {word}...").format(word=word))
+        if background.submit('network', self._get_deepl_translation, word, target_name, token=self.token) is None: self._update_results(_("Too many requests are in progress. Please try again in a moment."))
     def _get_deepl_translation(self, word, target_name):
         try:
             target_code = deepl_lang_codes.get(target_name)
-            if not target_code: wx.CallAfter(self._update_results, _("Error: Language not supported by DeepL.")); return
+            if not target_code: background.deliver(self.token, self._update_results, _("Error: Language not supported by DeepL.")); return
             result = self.translator.translate_text(word, target_lang=target_code)
-            wx.CallAfter(self._update_results, result.text, word, result.text)
-        except Exception as e: wx.CallAfter(self._update_results, _("A critical error occurred:\n\n{type}: {error}").format(type=type(e).__name__, error=e))
+            background.deliver(self.token, self._update_results, result.text, word, result.text)
+        except Exception as e: background.deliver(self.token, self._update_results, _("A critical error occurred:\n\n{type}: {error}").format(type=type(e).__name__, error=e))
     def _update_results(self, text, original_word=None, best_translation=None):
-        self.results_text.SetValue(text), self.search_button.Enable(), self.GetParent().SetStatusText(_("Translation complete."))
+        self.results_text.SetValue(self.memory_text + text), self.search_button.Enable(), self.search_online_button.Enable(), self.GetParent().SetStatusText(_("Translation complete."))
         if original_word and best_translation:
             self.last_search_term, self.last_best_translation = original_word, best_translation
             self.add_to_db_button.Enable()
@@ -361,16 +422,39 @@ class DeepLPanel(wx.Panel):
     def on_add_to_db(self, event):
         if self.last_search_term and self.last_best_translation:
             native, learned = self.last_search_term, self.last_best_translation
+            if memory_side(None, self.english_lang_map[self.target_lang_choice.GetStringSelection()]) == 'learned': native, learned = learned, native
             self.GetParent().add_word_to_db(native=native, learned=learned)
     def on_speak(self, event):
         target_lang = self.english_lang_map[self.target_lang_choice.GetStringSelection()]
         if self.last_best_translation and (lang_code := lang_codes.get(target_lang)):
-            threading.Thread(target=tts_handler.speak, args=(self.last_best_translation, lang_code, app_settings['keep_tts_cache']), daemon=True).start()
+            speak_async(self.last_best_translation, lang_code, self.token)
+
+class StatsPanel(wx.Panel):
+    def __init__(self, parent):
+        super().__init__(parent); main_sizer, stats_box = wx.BoxSizer(wx.VERTICAL), wx.StaticBox(self, label=_("Statistics")); sizer = wx.StaticBoxSizer(stats_box, wx.VERTICAL); self.stats_text = wx.TextCtrl(self, style=wx.TE_MULTILINE | wx.TE_READONLY | wx.TE_RICH2); self.stats_text.SetFont(wx.Font(11, wx.FONTFAMILY_TELETYPE, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL)); self.close_button = wx.Button(self, label=_("Close")); self.Bind(wx.EVT_BUTTON, lambda e: self.GetParent().show_database_panel(), self.close_button); sizer.Add(self.stats_text, 1, wx.EXPAND | wx.ALL, 10), sizer.Add(self.close_button, 0, wx.ALIGN_CENTER | wx.BOTTOM, 10); main_sizer.Add(sizer, 1, wx.EXPAND | wx.ALL, 20), self.SetSizer(main_sizer), self.populate_stats(); self.stats_text.SetFocus()
+    def populate_stats(self):
+        stats, today = database.get_dictionary_stats(), date.today()
+        output = [_("Dictionaries:")]
+        for dict_id, name in database.get_dictionaries():
+            total, due, young, mature, ease = stats.get(dict_id, (0, 0, 0, 0, 0.0))
+            output.append(_("- {name}: {total} words, {due} due today, {young} young, {mature} mature, average ease {ease:.2f}").format(name=name, total=total, due=due, young=young, mature=mature, ease=ease))
+        total_words, total_mature = sum(s[0] for s in stats.values()), sum(s[3] for s in stats.values())
+        if total_words: output.append(_("Mature words (interval of {days}+ days): {percent}%").format(days=database.MATURE_INTERVAL, percent=round(100 * total_mature / total_words)))
+        forecast = database.get_due_forecast(90)
+        output.append(""), output.append(_("Due in the next 30 days: {count}").format(count=sum(forecast[:30])))
+        for offset in range(30):
+            if forecast[offset]: output.append(f"  {(today + timedelta(days=offset)).isoformat()}: {forecast[offset]}")
+        output.append(""), output.append(_("Due in the next 90 days: {count}").format(count=sum(forecast)))
+        for week in range(0, 90, 7):
+            if (count := sum(forecast[week:week + 7])): output.append(_("  Week of {day}: {count}").format(day=(today + timedelta(days=week)).isoformat(), count=count))
+        self.stats_text.SetValue("\n".join(output))
 
 # --- Main Application Frame ---
 class MainFrame(wx.Frame):
     def __init__(self, parent):
-        super().__init__(parent=parent, title="Powerlang", size=(800, 600)); self.main_sizer, self.current_content, self.needs_restart = wx.BoxSizer(wx.VERTICAL), None, False; self.SetSizer(self.main_sizer); self.create_menubar(); self.CreateStatusBar(); self.show_database_panel(); self.Center(); self.Show()
+        super().__init__(parent=parent, title="Powerlang", size=(800, 600)); self.token, self.last_activity = background.panel_token(self), time.monotonic(); self.Bind(wx.EVT_CLOSE, self.on_close); self.maintenance_timer = wx.CallLater(MAINTENANCE_DELAY_MS, self.run_maintenance); self.main_sizer, self.current_content, self.needs_restart = wx.BoxSizer(wx.VERTICAL), None, False; self.SetSizer(self.main_sizer); self.create_menubar(); self.CreateStatusBar(); self.show_database_panel(); self.Center(); self.Show()
+        # Finish dictionary deletes that were interrupted when the app was last closed.
+        for dict_id in database.get_pending_deletions(): background.submit('db', database.delete_dictionary, dict_id, None, background.shutting_down, token=self.token, on_done=self.on_dictionary_deleted)
     def switch_panel(self, new_panel_class):
         if self.current_content: self.current_content.Destroy()
         self.current_content = new_panel_class(self)
@@ -382,9 +466,10 @@ class MainFrame(wx.Frame):
     def show_online_dict_panel(self): self.switch_panel(OnlineDictPanel)
     def show_deepl_panel(self): self.switch_panel(DeepLPanel)
     def show_pronunciation_panel(self): self.switch_panel(PronunciationPanel)
+    def show_stats_panel(self): self.switch_panel(StatsPanel)
     def create_menubar(self):
-        menu_bar = wx.MenuBar(); ID_MENU_REVIEW, ID_MENU_QUIZ_TEST, ID_MENU_PRONUNCIATION = wx.NewIdRef(), wx.NewIdRef(), wx.NewIdRef(); ID_MENU_DB_CREATE, ID_MENU_DB_EDIT, ID_MENU_FLASHCARDS, ID_MENU_ONLINE_DICT, ID_MENU_DEEPL = wx.NewIdRef(), wx.NewIdRef(), wx.NewIdRef(), wx.NewIdRef(), wx.NewIdRef(); ID_MENU_SETTINGS, ID_MENU_SETTINGS_EXPORT, ID_MENU_SETTINGS_IMPORT = wx.NewIdRef(), wx.NewIdRef(), wx.NewIdRef(); learn_menu, database_menu, flashcards_menu, online_tools_menu, settings_menu, file_menu = wx.Menu(), wx.Menu(), wx.Menu(), wx.Menu(), wx.Menu(), wx.Menu(); learn_menu.Append(ID_MENU_REVIEW, _("&Review Due Words")), learn_menu.AppendSeparator(), learn_menu.Append(ID_MENU_QUIZ_TEST, _("&Practice Quiz (Random)")), learn_menu.Append(ID_MENU_PRONUNCIATION, _("&Pronunciation Practice")); database_menu.Append(ID_MENU_DB_CREATE, _("&Create New Dictionary...")), database_menu.Append(ID_MENU_DB_EDIT, _("&View/Edit Dictionaries")); flashcards_menu.Append(ID_MENU_FLASHCARDS, _("&Start Session")), online_tools_menu.Append(ID_MENU_ONLINE_DICT, _("&Online Translator (MyMemory)")), online_tools_menu.Append(ID_MENU_DEEPL, _("&DeepL Translator")); settings_menu.Append(ID_MENU_SETTINGS, _("Change &Settings...")), settings_menu.AppendSeparator(), settings_menu.Append(ID_MENU_SETTINGS_EXPORT, _("&Export Database...")), settings_menu.Append(ID_MENU_SETTINGS_IMPORT, _("&Import Database...")); exit_item = file_menu.Append(wx.ID_EXIT, _("&Exit")); menu_bar.Append(learn_menu, _("&Learn")), menu_bar.Append(database_menu, _("&Database")), menu_bar.Append(flashcards_menu, _("F&lashcards")), menu_bar.Append(online_tools_menu, _("Online &Tools")), menu_bar.Append(settings_menu, "&Settings"), menu_bar.Append(file_menu, "&File"); self.SetMenuBar(menu_bar)
-        self.Bind(wx.EVT_MENU, lambda e: self.show_review_panel(), id=ID_MENU_REVIEW), self.Bind(wx.EVT_MENU, lambda e: self.show_quiz_panel(), id=ID_MENU_QUIZ_TEST), self.Bind(wx.EVT_MENU, lambda e: self.show_pronunciation_panel(), id=ID_MENU_PRONUNCIATION), self.Bind(wx.EVT_MENU, self.on_db_create, id=ID_MENU_DB_CREATE), self.Bind(wx.EVT_MENU, lambda e: self.show_database_panel(), id=ID_MENU_DB_EDIT), self.Bind(wx.EVT_MENU, lambda e: self.show_flashcards_panel(), id=ID_MENU_FLASHCARDS), self.Bind(wx.EVT_MENU, lambda e: self.show_online_dict_panel(), id=ID_MENU_ONLINE_DICT), self.Bind(wx.EVT_MENU, lambda e: self.show_deepl_panel(), id=ID_MENU_DEEPL), self.Bind(wx.EVT_MENU, self.on_settings, id=ID_MENU_SETTINGS), self.Bind(wx.EVT_MENU, self.on_export, id=ID_MENU_SETTINGS_EXPORT), self.Bind(wx.EVT_MENU, self.on_import, id=ID_MENU_SETTINGS_IMPORT), self.Bind(wx.EVT_MENU, lambda e: self.Close(), exit_item)
+        menu_bar = wx.MenuBar(); ID_MENU_REVIEW, ID_MENU_QUIZ_TEST, ID_MENU_PRONUNCIATION = wx.NewIdRef(), wx.NewIdRef(), wx.NewIdRef(); ID_MENU_DB_CREATE, ID_MENU_DB_EDIT, ID_MENU_FLASHCARDS, ID_MENU_ONLINE_DICT, ID_MENU_DEEPL = wx.NewIdRef(), wx.NewIdRef(), wx.NewIdRef(), wx.NewIdRef(), wx.NewIdRef(); ID_MENU_SETTINGS, ID_MENU_SETTINGS_EXPORT, ID_MENU_SETTINGS_IMPORT, ID_MENU_DB_STATS = wx.NewIdRef(), wx.NewIdRef(), wx.NewIdRef(), wx.NewIdRef(); ID_MENU_DECK_EXPORT, ID_MENU_DECK_IMPORT, ID_MENU_ANKI_IMPORT, ID_MENU_DB_MAINTENANCE = wx.NewIdRef(), wx.NewIdRef(), wx.NewIdRef(), wx.NewIdRef(); learn_menu, database_menu, flashcards_menu, online_tools_menu, settings_menu, file_menu = wx.Menu(), wx.Menu(), wx.Menu(), wx.Menu(), wx.Menu(), wx.Menu(); learn_menu.Append(ID_MENU_REVIEW, _("&Review Due Words")), learn_menu.AppendSeparator(), learn_menu.Append(ID_MENU_QUIZ_TEST, _("&Practice Quiz (Random)")), learn_menu.Append(ID_MENU_PRONUNCIATION, _("&Pronunciation Practice")); database_menu.Append(ID_MENU_DB_CREATE, _("&Create New Dictionary...")), database_menu.Append(ID_MENU_DB_EDIT, _("&View/Edit Dictionaries")), database_menu.Append(ID_MENU_DB_STATS, _("&Statistics")), database_menu.AppendSeparator(), database_menu.Append(ID_MENU_DB_MAINTENANCE, _("Run &Maintenance")); flashcards_menu.Append(ID_MENU_FLASHCARDS, _("&Start Session")), online_tools_menu.Append(ID_MENU_ONLINE_DICT, _("&Online Translator (MyMemory)")), online_tools_menu.Append(ID_MENU_DEEPL, _("&DeepL Translator")); settings_menu.Append(ID_MENU_SETTINGS, _("Change &Settings...")), settings_menu.AppendSeparator(), settings_menu.Append(ID_MENU_SETTINGS_EXPORT, _("&Export Database...")), settings_menu.Append(ID_MENU_SETTINGS_IMPORT, _("&Import Database...")), settings_menu.AppendSeparator(), settings_menu.Append(ID_MENU_DECK_EXPORT, _("Export Deck &Package...")), settings_menu.Append(ID_MENU_DECK_IMPORT, _("Import Deck Pac&kage...")), settings_menu.Append(ID_MENU_ANKI_IMPORT, _("Import &Anki Deck...")); exit_item = file_menu.Append(wx.ID_EXIT, _("&Exit")); menu_bar.Append(learn_menu, _("&Learn")), menu_bar.Append(database_menu, _("&Database")), menu_bar.Append(flashcards_menu, _("F&lashcards")), menu_bar.Append(online_tools_menu, _("Online &Tools")), menu_bar.Append(settings_menu, "&Settings"), menu_bar.Append(file_menu, "&File"); self.SetMenuBar(menu_bar)
+        self.Bind(wx.EVT_MENU, lambda e: self.show_review_panel(), id=ID_MENU_REVIEW), self.Bind(wx.EVT_MENU, lambda e: self.show_quiz_panel(), id=ID_MENU_QUIZ_TEST), self.Bind(wx.EVT_MENU, lambda e: self.show_pronunciation_panel(), id=ID_MENU_PRONUNCIATION), self.Bind(wx.EVT_MENU, self.on_db_create, id=ID_MENU_DB_CREATE), self.Bind(wx.EVT_MENU, lambda e: self.show_database_panel(), id=ID_MENU_DB_EDIT), self.Bind(wx.EVT_MENU, lambda e: self.show_stats_panel(), id=ID_MENU_DB_STATS), self.Bind(wx.EVT_MENU, lambda e: self.run_maintenance(manual=True), id=ID_MENU_DB_MAINTENANCE), self.Bind(wx.EVT_MENU, lambda e: self.show_flashcards_panel(), id=ID_MENU_FLASHCARDS), self.Bind(wx.EVT_MENU, lambda e: self.show_online_dict_panel(), id=ID_MENU_ONLINE_DICT), self.Bind(wx.EVT_MENU, lambda e: self.show_deepl_panel(), id=ID_MENU_DEEPL), self.Bind(wx.EVT_MENU, self.on_settings, id=ID_MENU_SETTINGS), self.Bind(wx.EVT_MENU, self.on_export, id=ID_MENU_SETTINGS_EXPORT), self.Bind(wx.EVT_MENU, self.on_import, id=ID_MENU_SETTINGS_IMPORT), self.Bind(wx.EVT_MENU, self.on_export_deck, id=ID_MENU_DECK_EXPORT), self.Bind(wx.EVT_MENU, self.on_import_deck, id=ID_MENU_DECK_IMPORT), self.Bind(wx.EVT_MENU, self.on_import_anki, id=ID_MENU_ANKI_IMPORT), self.Bind(wx.EVT_MENU, lambda e: self.Close(), exit_item)
     def add_word_to_db(self, word_id=None, native="", learned="", notes=""):
         title = _("Edit Word") if word_id else _("Add New Word"); dictionaries = database.get_dictionaries()
         if not dictionaries: wx.MessageBox(_("You must create at least one dictionary before adding words."), _("No Dictionaries Found"), wx.OK | wx.ICON_ERROR); return
@@ -396,16 +481,45 @@ class MainFrame(wx.Frame):
                 with wx.SingleChoiceDialog(self, _("Choose a dictionary to save to:"), _("Select Dictionary"), dict_names) as choice_dlg:
                     if choice_dlg.ShowModal() == wx.ID_OK:
                         selected_dict_id = [d[0] for d in dictionaries if d[1] == choice_dlg.GetStringSelection()][0]
-                        if word_id: database.update_word(word_id, values['native'], values['learned'], values['notes'])
-                        else: database.add_word(values['native'], values['learned'], values['notes'], selected_dict_id)
-                        if isinstance(self.current_content, DatabasePanel): self.current_content.populate_words()
+                        if word_id: background.submit('db', database.update_word, word_id, values['native'], values['learned'], values['notes'], token=self.token, on_done=self.on_word_saved)
+                        else: background.submit('db', database.add_word, values['native'], values['learned'], values['notes'], selected_dict_id, token=self.token, on_done=self.on_word_saved)
+    def on_word_saved(self, result):
+        if isinstance(self.current_content, DatabasePanel): self.current_content.populate_words()
+    def on_dictionary_deleted(self, deleted):
+        # Large deletes leave free pages behind, so reclaim them soon rather than at the next scheduled run.
+        self.SetStatusText(""), self.schedule_maintenance(5000)
+        if isinstance(self.current_content, DatabasePanel): self.current_content.populate_dictionaries()
+    def on_close(self, event):
+        # Drain queued database writes before the window (and the process) goes away. Dictionary deletes stop
+        # at their next chunk and resume on the next start, but a running maintenance step has to finish first.
+        self.SetStatusText(_("Finishing database work...")), self.Update(), self.maintenance_timer.Stop(), background.shutdown(); event.Skip()
+    def schedule_maintenance(self, delay_ms=MAINTENANCE_INTERVAL_MS):
+        if self.maintenance_timer.IsRunning(): self.maintenance_timer.Stop()
+        self.maintenance_timer = wx.CallLater(delay_ms, self.run_maintenance)
+    def run_maintenance(self, manual=False):
+        # Runs on the single database worker, so it never interleaves with queued writes. Maintenance holds the
+        # database lock while it runs, so automatic runs wait until the user has stopped using the app for a while,
+        # and only a run started from the menu may do the one-time full VACUUM.
+        if not manual and time.monotonic() - self.last_activity < MAINTENANCE_IDLE_SECONDS: self.schedule_maintenance(MAINTENANCE_RETRY_MS); return
+        if manual: self.SetStatusText(_("Running database maintenance..."))
+        if background.submit('db', maintenance.run_maintenance, full_vacuum=manual, token=self.token, on_done=lambda report: self.on_maintenance_done(report, manual), on_error=lambda e: self.on_maintenance_error(e, manual)) is None: self.schedule_maintenance()
+    def on_maintenance_done(self, report, manual):
+        total_ms = round(sum(report.timings.values()) * 1000)
+        message = _("Database maintenance finished: reclaimed {size} KB in {ms} ms.").format(size=report.reclaimed_bytes // 1024, ms=total_ms)
+        self.SetStatusText(message), self.schedule_maintenance()
+        if not report.integrity_ok: wx.MessageBox(_("The database integrity check found problems:\n\n{errors}").format(errors="\n".join(report.integrity_errors[:20])), _("Database Maintenance"), wx.OK | wx.ICON_WARNING)
+        elif manual: wx.MessageBox(message, _("Database Maintenance"), wx.OK | wx.ICON_INFORMATION)
+    def on_maintenance_error(self, error, manual):
+        print(f"Database maintenance failed: {error}"); self.schedule_maintenance()
+        if manual: wx.MessageBox(_("A critical error occurred:\n\n{type}: {error}").format(type=type(error).__name__, error=error), _("Database Maintenance"), wx.OK | wx.ICON_ERROR)
     def on_db_create(self, event):
         with wx.TextEntryDialog(self, _('Enter the name for the new dictionary:'), _('Create Dictionary')) as dlg:
             if dlg.ShowModal() == wx.ID_OK:
                 dict_name = dlg.GetValue().strip()
-                if dict_name:
-                    if not database.create_dictionary(dict_name): wx.MessageBox(_("A dictionary named '{name}' already exists.").format(name=dict_name), _("Error"), wx.OK | wx.ICON_ERROR)
-                    elif isinstance(self.current_content, DatabasePanel): self.current_content.populate_dictionaries()
+                if dict_name: background.submit('db', database.create_dictionary, dict_name, token=self.token, on_done=lambda created: self.on_dictionary_created(created, dict_name))
+    def on_dictionary_created(self, created, dict_name):
+        if not created: wx.MessageBox(_("A dictionary named '{name}' already exists.").format(name=dict_name), _("Error"), wx.OK | wx.ICON_ERROR)
+        elif isinstance(self.current_content, DatabasePanel): self.current_content.populate_dictionaries()
     def on_settings(self, event):
         self.needs_restart = False
         with SettingsDialog(self) as dlg: dlg.ShowModal()
@@ -415,16 +529,47 @@ class MainFrame(wx.Frame):
     def on_export(self, event):
         with wx.FileDialog(self, _("Save Database Export"), wildcard=_("CSV files (*.csv)|*.csv"), style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as dlg:
             if dlg.ShowModal() == wx.ID_CANCEL: return
-            try: wx.MessageBox(_("Successfully exported {count} words.").format(count=database.export_all_to_csv(dlg.GetPath())), _("Export Complete"), wx.OK | wx.ICON_INFORMATION)
-            except Exception as e: wx.MessageBox(_("An error occurred during export:\n{error}").format(error=e), _("Export Error"), wx.OK | wx.ICON_ERROR)
+            background.submit('db', database.export_all_to_csv, dlg.GetPath(), token=self.token, on_done=lambda count: wx.MessageBox(_("Successfully exported {count} words.").format(count=count), _("Export Complete"), wx.OK | wx.ICON_INFORMATION), on_error=lambda e: wx.MessageBox(_("An error occurred during export:\n{error}").format(error=e), _("Export Error"), wx.OK | wx.ICON_ERROR))
     def on_import(self, event):
         with wx.FileDialog(self, _("Open Database Import File"), wildcard=_("CSV files (*.csv)|*.csv"), style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as dlg:
             if dlg.ShowModal() == wx.ID_CANCEL: return
-            try:
-                count = database.import_from_csv(dlg.GetPath())
-                wx.MessageBox(_("Successfully imported {count} words.").format(count=count), _("Import Complete"), wx.OK | wx.ICON_INFORMATION)
-                if isinstance(self.current_content, DatabasePanel): self.current_content.populate_dictionaries()
-            except Exception as e: wx.MessageBox(_("An error occurred during import:\n{error}").format(error=e), _("Import Error"), wx.OK | wx.ICON_ERROR)
+            background.submit('db', database.import_from_csv, dlg.GetPath(), token=self.token, on_done=self.on_csv_imported, on_error=lambda e: wx.MessageBox(_("An error occurred during import:\n{error}").format(error=e), _("Import Error"), wx.OK | wx.ICON_ERROR))
+    def on_csv_imported(self, count):
+        wx.MessageBox(_("Successfully imported {count} words.").format(count=count), _("Import Complete"), wx.OK | wx.ICON_INFORMATION)
+        if isinstance(self.current_content, DatabasePanel): self.current_content.populate_dictionaries()
+    def on_export_deck(self, event):
+        dictionaries = database.get_dictionaries()
+        if not dictionaries: wx.MessageBox(_("There are no dictionaries to export."), _("No Dictionaries Found"), wx.OK | wx.ICON_ERROR); return
+        with wx.MultiChoiceDialog(self, _("Choose the dictionaries to include in the deck package:"), _("Export Deck Package"), [name for id, name in dictionaries]) as choice_dlg:
+            if choice_dlg.ShowModal() != wx.ID_OK or not choice_dlg.GetSelections(): return
+            dict_ids = [dictionaries[i][0] for i in choice_dlg.GetSelections()]
+        with wx.FileDialog(self, _("Save Deck Package"), wildcard=_("Powerlang deck packages (*.pldeck)|*.pldeck"), style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) as dlg:
+            if dlg.ShowModal() == wx.ID_CANCEL: return
+            self.SetStatusText(_("Exporting deck package..."))
+            background.submit('db', deck_package.export_deck, dlg.GetPath(), tts_handler.CACHE_DIR, dict_ids, token=self.token, on_done=self.on_deck_exported, on_error=lambda e: wx.MessageBox(_("An error occurred during export:\n{error}").format(error=e), _("Export Error"), wx.OK | wx.ICON_ERROR))
+    def on_deck_exported(self, result):
+        self.SetStatusText(""), wx.MessageBox(_("Successfully exported {count} words and {audio} audio files.").format(count=result[0], audio=result[1]), _("Export Complete"), wx.OK | wx.ICON_INFORMATION)
+    def on_import_deck(self, event):
+        with wx.FileDialog(self, _("Open Deck Package"), wildcard=_("Powerlang deck packages (*.pldeck)|*.pldeck"), style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as dlg:
+            if dlg.ShowModal() == wx.ID_CANCEL: return
+            self.SetStatusText(_("Importing deck package..."))
+            background.submit('db', deck_package.import_deck, dlg.GetPath(), tts_handler.CACHE_DIR, token=self.token, on_done=self.on_deck_imported, on_error=lambda e: wx.MessageBox(_("An error occurred during import:\n{error}").format(error=e), _("Import Error"), wx.OK | wx.ICON_ERROR))
+    def on_deck_imported(self, result):
+        self.SetStatusText(""), wx.MessageBox(_("Successfully imported {count} words and {audio} new audio files.").format(count=result[0], audio=result[1]), _("Import Complete"), wx.OK | wx.ICON_INFORMATION)
+        if isinstance(self.current_content, DatabasePanel): self.current_content.populate_dictionaries()
+    def on_import_anki(self, event):
+        with wx.FileDialog(self, _("Open Anki Deck"), wildcard=_("Anki decks (*.apkg;*.colpkg;*.anki2)|*.apkg;*.colpkg;*.anki2"), style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as dlg:
+            if dlg.ShowModal() == wx.ID_CANCEL: return
+            path = dlg.GetPath()
+        with wx.MessageDialog(self, _("Is the front of the Anki cards written in your native language?"), _("Import Anki Deck"), wx.YES_NO | wx.YES_DEFAULT | wx.ICON_QUESTION) as side_dlg: front_is_native = side_dlg.ShowModal() == wx.ID_YES
+        self.SetStatusText(_("Importing Anki deck..."))
+        progress = lambda done, total: background.deliver(self.token, self.SetStatusText, _("Importing Anki deck... {done} of {total} words").format(done=done, total=total))
+        background.submit('db', anki_import.import_anki, path, front_is_native, progress, token=self.token, on_done=self.on_anki_imported, on_error=lambda e: wx.MessageBox(_("An error occurred during import:\n{error}").format(error=e), _("Import Error"), wx.OK | wx.ICON_ERROR))
+    def on_anki_imported(self, result):
+        count, skipped = result; message = _("Successfully imported {count} words.").format(count=count)
+        if skipped: message += "\n\n" + _("Skipped {count} notes with an empty front or back, such as image- or audio-only cards.").format(count=skipped)
+        self.SetStatusText(""), wx.MessageBox(message, _("Import Complete"), wx.OK | wx.ICON_INFORMATION)
+        if isinstance(self.current_content, DatabasePanel): self.current_content.populate_dictionaries()
 
 # --- Main App Class to handle restart ---
 class App(wx.App):
@@ -432,6 +577,10 @@ class App(wx.App):
         super().__init__(*args, **kwargs)
         self.frame = None
         self.init_main_frame()
+    def FilterEvent(self, event):
+        # Every key press or mouse action anywhere in the app counts as activity for idle-time maintenance.
+        if self.frame and event.GetEventType() in ACTIVITY_EVENTS: self.frame.last_activity = time.monotonic()
+        return wx.EventFilter.Event_Skip
     def init_main_frame(self):
         self.frame = MainFrame(None)
     def restart_app(self):
@@ -461,4 +610,4 @@ if __name__ == '__main__':
     if start_app:
         database.init_database()
         app = App()
-        app.MainLoop()
\ No newline at end of file
+        app.MainLoop()
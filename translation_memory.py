@@ -0,0 +1,88 @@
+# translation_memory.py
+# Looks up words the user already has in their dictionaries before going to an online translator.
+
+import sqlite3
+from itertools import combinations
+import database
+
+FUZZY_THRESHOLD = 0.5 # Minimum trigram similarity (0-1) for a fuzzy match
+FUZZY_CANDIDATES = 1000 # Rows taken from the trigram index before scoring
+FUZZY_PROBE_TRIGRAMS = 4 # Candidates must share two of the term's rarest trigrams
+
+SIDES = {'native': ('native_word', 'learned_word'), 'learned': ('learned_word', 'native_word')}
+
+def _trigrams(text):
+    text = text.casefold()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def similarity(a, b):
+    """Dice coefficient of the two strings' trigram sets, 1.0 for a case-insensitive exact match."""
+    if a.casefold() == b.casefold(): return 1.0
+    grams_a, grams_b = _trigrams(a), _trigrams(b)
+    if not grams_a or not grams_b: return 0.0
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+def _exact(cursor, term, sides):
+    # NOCASE only folds ASCII, so also try the common case variants of non-ASCII words.
+    variants = list(dict.fromkeys([term, term.lower(), term.capitalize()]))
+    placeholders = ",".join("?" * len(variants))
+    rows = []
+    for side in sides:
+        column, other = SIDES[side]
+        cursor.execute(f"""
+            SELECT w.id, w.{column}, w.{other}, d.name FROM words w JOIN dictionaries d ON d.id = w.dictionary_id
+            WHERE w.{column} COLLATE NOCASE IN ({placeholders})
+        """, variants)
+        rows += [(word_id, side, source, translation, dict_name) for word_id, source, translation, dict_name in cursor.fetchall() if source.casefold() == term.casefold()]
+    return rows
+
+def _quote(gram): return '"' + gram.replace('"', '""') + '"'
+
+def _fuzzy(cursor, term, sides):
+    grams = _trigrams(term)
+    if not grams: return []
+    try:
+        # Probe with the rarest trigrams only, so the index never has to visit (or rank) every row that
+        # shares a common one. Requiring any two of them keeps a typo in one from hiding the word.
+        placeholders = ",".join("?" * len(grams))
+        cursor.execute(f"SELECT term FROM words_trigram_vocab WHERE term IN ({placeholders}) ORDER BY doc LIMIT ?", (*grams, FUZZY_PROBE_TRIGRAMS))
+        rare = [row[0] for row in cursor.fetchall()]
+        if not rare: return []
+        query = " OR ".join(f"({_quote(a)} AND {_quote(b)})" for a, b in combinations(rare, 2)) if len(rare) > 1 else _quote(rare[0])
+        cursor.execute("""
+            SELECT w.id, w.native_word, w.learned_word, d.name FROM words_trigram t
+            JOIN words w ON w.id = t.rowid JOIN dictionaries d ON d.id = w.dictionary_id
+            WHERE words_trigram MATCH ? LIMIT ?
+        """, (query, FUZZY_CANDIDATES))
+    except sqlite3.OperationalError: return [] # No FTS5 in this SQLite build
+    rows = []
+    for word_id, native, learned, dict_name in cursor.fetchall():
+        if 'native' in sides: rows.append((word_id, 'native', native, learned, dict_name))
+        if 'learned' in sides: rows.append((word_id, 'learned', learned, native, dict_name))
+    return rows
+
+def lookup(term, side=None, limit=10):
+    """
+    Finds `term` in the user's dictionaries. `side` is 'native' or 'learned' to search only that
+    column, or None for both directions. Returns up to `limit` matches as
+    (score, side, source_text, translation, dictionary_name), best first; exact matches score 1.0.
+    """
+    term = term.strip()
+    if not term: return []
+    sides = [side] if side else list(SIDES)
+    conn = database.connect()
+    cursor = conn.cursor()
+    matches, seen = [], set()
+    for word_id, match_side, source, translation, dict_name in _exact(cursor, term, sides) + _fuzzy(cursor, term, sides):
+        if (word_id, match_side) in seen: continue
+        score = similarity(term, source)
+        if score >= FUZZY_THRESHOLD:
+            seen.add((word_id, match_side))
+            matches.append((score, match_side, source, translation, dict_name))
+    conn.close()
+    matches.sort(key=lambda match: -match[0])
+    return matches[:limit]
+
+def best_exact(matches, side=None):
+    """Returns the first exact match from lookup() results, or None. `side` limits it to matches on that column."""
+    return next((match for match in matches if match[0] == 1.0 and side in (None, match[1])), None)
@@ -14,6 +14,8 @@ LANG_NAMES = {
     "Turkish": {"ru": "Турецкий", "hu": "Török"},
 }
 TRANSLATIONS = {
+    "  (Your entry: {source} in {dictionary}, Match: {score}%)": {"ru": "  (Ваша запись: {source} в словаре {dictionary}, совпадение: {score}%)", "hu": "  (Saját bejegyzés: {source}, szótár: {dictionary}, egyezés: {score}%)"},
+    "  Week of {day}: {count}": {"ru": "  Неделя с {day}: {count}", "hu": "  {day} hete: {count}"},
     "&Add to Database...": {"ru": "&Добавить в словарь...", "hu": "&Hozzáadás a szótárhoz..."},
     "&Close": {"ru": "&Закрыть", "hu": "&Bezárás"},
     "&Create New Dictionary...": {"ru": "&Создать словарь...", "hu": "&Új szótár létrehozása..."},
@@ -36,8 +38,10 @@ TRANSLATIONS = {
     "&Review Due Words": {"ru": "&Повторение", "hu": "&Kikérdezés"},
     "&Settings": {"ru": "&Настройки", "hu": "&Beállítások"},
     "&Start Session": {"ru": "&Начать", "hu": "&Indítás"},
+    "&Statistics": {"ru": "&Статистика", "hu": "&Statisztika"},
     "&View/Edit Dictionaries": {"ru": "&Мои словари", "hu": "&Szótáraim"},
     "&Word to Translate": {"ru": "&Слово для перевода", "hu": "&Fordítandó szó"},
+    "- {name}: {total} words, {due} due today, {young} young, {mature} mature, average ease {ease:.2f}": {"ru": "- {name}: {total} слов, {due} к повторению сегодня, {young} новых, {mature} выученных, средняя лёгкость {ease:.2f}", "hu": "- {name}: {total} szó, ma esedékes: {due}, friss: {young}, megszilárdult: {mature}, átlagos könnyűség: {ease:.2f}"},
     "API Error: {details}": {"ru": "Ошибка API: {details}", "hu": "API hiba: {details}"},
     "API Keys": {"ru": "Ключи API", "hu": "API kulcsok"},
     "Add New Word": {"ru": "Добавить новое слово", "hu": "Új szó hozzáadása"},
@@ -45,6 +49,7 @@ TRANSLATIONS = {
     "All words for this session have been reviewed!": {"ru": "Все слова на эту сессию повторены!", "hu": "Minden szó ki lett kérdezve ebből a körből!"},
     "An error occurred during export:\n{error}": {"ru": "Произошла ошибка при экспорте:\n{error}", "hu": "Hiba történt exportálás közben:\n{error}"},
     "An error occurred during import:\n{error}": {"ru": "Произошла ошибка при импорте:\n{error}", "hu": "Hiba történt importálás közben:\n{error}"},
+    "Anki decks (*.apkg;*.colpkg;*.anki2)|*.apkg;*.colpkg;*.anki2": {"ru": "Колоды Anki (*.apkg;*.colpkg;*.anki2)|*.apkg;*.colpkg;*.anki2", "hu": "Anki paklik (*.apkg;*.colpkg;*.anki2)|*.apkg;*.colpkg;*.anki2"},
     "Answer": {"ru": "Ответ", "hu": "Válasz"},
     "Application Language": {"ru": "Язык интерфейса", "hu": "Alkalmazás nyelve"},
     "Are you sure you want to permanently delete the entire dictionary '{name}' and all the words in it?": {"ru": "Вы уверены, что хотите навсегда удалить словарь «{name}» и все слова в нем?", "hu": "Biztosan véglegesen törli a(z) '{name}' szótárat és az összes benne lévő szót?"},
@@ -55,15 +60,22 @@ TRANSLATIONS = {
     "Change &Settings...": {"ru": "&Изменить настройки...", "hu": "&Beállítások módosítása..."},
     "Check Answer": {"ru": "Проверить", "hu": "Ellenőrzés"},
     "Choose a dictionary to save to:": {"ru": "Выберите словарь для сохранения:", "hu": "Melyik szótárba mentsem?"},
+    "Choose the dictionaries to include in the deck package:": {"ru": "Выберите словари для пакета колоды:", "hu": "Válaszd ki a pakli csomagba kerülő szótárakat:"},
     "Close": {"ru": "Закрыть", "hu": "Bezárás"},
     "Confirm Delete": {"ru": "Подтверждение удаления", "hu": "Törlés megerősítése"},
     "Confirm Delete Dictionary": {"ru": "Подтверждение удаления словаря", "hu": "Szótár törlésének megerősítése"},
     "Correct!": {"ru": "Правильно!", "hu": "Helyes!"},
     "Create Dictionary": {"ru": "Создать словарь", "hu": "Szótár létrehozása"},
+    "Database Maintenance": {"ru": "Обслуживание базы данных", "hu": "Adatbázis karbantartás"},
+    "Database maintenance finished: reclaimed {size} KB in {ms} ms.": {"ru": "Обслуживание базы завершено: освобождено {size} КБ за {ms} мс.", "hu": "Az adatbázis karbantartása kész: {size} KB felszabadítva {ms} ms alatt."},
     "DeepL API Key (Free or Pro):": {"ru": "Ключ API DeepL (Free или Pro):", "hu": "DeepL API kulcs (Free vagy Pro):"},
     "DeepL requires an API key. Please add it in the Settings menu.": {"ru": "DeepL требует ключ API. Пожалуйста, добавьте его в меню настроек.", "hu": "A DeepL-hez API kulcs szükséges. Kérlek, add meg a Beállítások menüben."},
     "Delete This Dictionary": {"ru": "Удалить словарь", "hu": "Szótár törlése"},
+    "Deleting dictionary... {count} words removed": {"ru": "Удаление словаря... удалено слов: {count}", "hu": "Szótár törlése... {count} szó törölve"},
+    "Dictionaries:": {"ru": "Словари:", "hu": "Szótárak:"},
     "Dictionary:": {"ru": "Словарь:", "hu": "Szótár:"},
+    "Due in the next 30 days: {count}": {"ru": "К повторению в ближайшие 30 дней: {count}", "hu": "Esedékes a következő 30 napban: {count}"},
+    "Due in the next 90 days: {count}": {"ru": "К повторению в ближайшие 90 дней: {count}", "hu": "Esedékes a következő 90 napban: {count}"},
     "Easy": {"ru": "Легко", "hu": "Könnyű"},
     "Edit Word": {"ru": "Редактировать слово", "hu": "Szó szerkesztése"},
     "Edit Word...": {"ru": "Редактировать...", "hu": "Szerkesztés..."},
@@ -75,28 +87,41 @@ TRANSLATIONS = {
     "Error: Language not configured.": {"ru": "Ошибка: Язык не настроен.", "hu": "Hiba: A nyelv nincs beállítva."},
     "Error: Language not supported by DeepL.": {"ru": "Ошибка: DeepL не поддерживает этот язык.", "hu": "Hiba: Ezt a nyelvet a DeepL nem támogatja."},
     "Export Complete": {"ru": "Экспорт завершен", "hu": "Exportálás kész"},
+    "Export Deck &Package...": {"ru": "Экспорт &пакета колоды...", "hu": "&Pakli csomag exportálása..."},
+    "Export Deck Package": {"ru": "Экспорт пакета колоды", "hu": "Pakli csomag exportálása"},
     "Export Error": {"ru": "Ошибка экспорта", "hu": "Exportálási hiba"},
+    "Exporting deck package...": {"ru": "Экспорт пакета колоды...", "hu": "Pakli csomag exportálása..."},
     "F&lashcards": {"ru": "К&арточки", "hu": "Tanuló&kártyák"},
     "Finished": {"ru": "Готово", "hu": "Kész"},
+    "Finishing database work...": {"ru": "Завершение работы с базой данных...", "hu": "Adatbázis-műveletek befejezése..."},
     "Flashcard session complete!": {"ru": "Сессия с карточками завершена!", "hu": "A kártyacsomag végére értél!"},
     "Flashcards": {"ru": "Карточки", "hu": "Tanulókártyák"},
     "Forgot (review in 1 day)": {"ru": "Не помню (через 1 день)", "hu": "Elfelejtettem (1 nap múlva)"},
+    "Found {count} matches for '{word}' in your dictionaries:\n": {"ru": "Найдено {count} совпадений для «{word}» в ваших словарях:\n", "hu": "{count} találat a(z) '{word}' szóra a szótáraidban:\n"},
     "Found {count} translation matches for '{word}':\n": {"ru": "Найдено {count} совпадений для «{word}»:\n", "hu": "{count} fordítási találat a(z) '{word}' szóra:\n"},
     "From:": {"ru": "С языка:", "hu": "Erről:"},
     "Good": {"ru": "Хорошо", "hu": "Jó"},
     "Grade Yourself": {"ru": "Оцените себя", "hu": "Hogyan ment?"},
     "Hard": {"ru": "Трудно", "hu": "Nehéz"},
     "How well did you know it?": {"ru": "Насколько хорошо вы это знали?", "hu": "Mennyire tudtad?"},
+    "Import &Anki Deck...": {"ru": "Импорт колоды &Anki...", "hu": "&Anki pakli importálása..."},
+    "Import Anki Deck": {"ru": "Импорт колоды Anki", "hu": "Anki pakli importálása"},
     "Import Complete": {"ru": "Импорт завершен", "hu": "Importálás kész"},
+    "Import Deck Pac&kage...": {"ru": "Импорт п&акета колоды...", "hu": "Pakli csomag &importálása..."},
     "Import Error": {"ru": "Ошибка импорта", "hu": "Importálási hiba"},
+    "Importing Anki deck...": {"ru": "Импорт колоды Anki...", "hu": "Anki pakli importálása..."},
+    "Importing Anki deck... {done} of {total} words": {"ru": "Импорт колоды Anki... {done} из {total} слов", "hu": "Anki pakli importálása... {done} / {total} szó"},
+    "Importing deck package...": {"ru": "Импорт пакета колоды...", "hu": "Pakli csomag importálása..."},
     "Incorrect.\nThe correct answer is: {answer}": {"ru": "Неправильно.\nПравильный ответ: {answer}", "hu": "Helytelen.\nA helyes válasz: {answer}"},
     "Input Error": {"ru": "Ошибка ввода", "hu": "Bemeneti hiba"},
     "Input Required": {"ru": "Требуется ввод", "hu": "Írj be valamit"},
     "Initial quiz complete. Now let's retry the {count} words you missed.": {"ru": "Первый этап завершен. Теперь повторим {count} слов, в которых вы ошиблись.", "hu": "Az első kör kész. Most jöjjön az a {count} szó, amit elrontottál."},
+    "Is the front of the Anki cards written in your native language?": {"ru": "Лицевая сторона карточек Anki написана на вашем родном языке?", "hu": "A kártyák elején az anyanyelveden szerepel a szó?"},
     "Keep audio files for faster loading": {"ru": "Сохранять аудиофайлы в кэше", "hu": "Hangfájlok megőrzése a gyorsítótárban"},
     "Language I'm Learning:": {"ru": "Я изучаю:", "hu": "Tanult nyelv:"},
     "Loading...": {"ru": "Загрузка...", "hu": "Töltés..."},
     "Manage your dictionaries.": {"ru": "Управление словарями.", "hu": "Szótárak kezelése."},
+    "Mature words (interval of {days}+ days): {percent}%": {"ru": "Выученные слова (интервал от {days} дней): {percent}%", "hu": "Megszilárdult szavak ({days}+ napos időköz): {percent}%"},
     "My Languages": {"ru": "Мои языки", "hu": "Nyelveim"},
     "My Native Language:": {"ru": "Мой родной язык:", "hu": "Anyanyelvem:"},
     "Native and Learned fields cannot be empty.": {"ru": "Поля для слов не могут быть пустыми.", "hu": "A szavak mezői nem lehetnek üresek."},
@@ -104,10 +129,13 @@ TRANSLATIONS = {
     "No words are due for review today. Great job!": {"ru": "На сегодня нет слов для повторения. Отлично!", "hu": "Mára nincs esedékes szó. Szép munka!"},
     "Not enough words in database for a quiz.": {"ru": "В базе недостаточно слов для теста.", "hu": "Nincs elég szó az adatbázisban a teszthez."},
     "Online &Tools": {"ru": "Онлайн-&инструменты", "hu": "Online &eszközök"},
+    "Open Anki Deck": {"ru": "Открыть колоду Anki", "hu": "Anki pakli megnyitása"},
     "Open Database Import File": {"ru": "Открыть файл импорта", "hu": "Importfájl megnyitása"},
+    "Open Deck Package": {"ru": "Открыть пакет колоды", "hu": "Pakli csomag megnyitása"},
     "Pause/Resume": {"ru": "Пауза/Продолжить", "hu": "Szünet/Folytatás"}, # NEW
     "Perfect!": {"ru": "Отлично!", "hu": "Tökéletes!"},
     "Please enter some text to speak.": {"ru": "Пожалуйста, введите текст для озвучивания.", "hu": "Kérlek, írj be szöveget a felolvasáshoz."},
+    "Powerlang deck packages (*.pldeck)|*.pldeck": {"ru": "Пакеты колод Powerlang (*.pldeck)|*.pldeck", "hu": "Powerlang pakli csomagok (*.pldeck)|*.pldeck"},
     "Practice Pronunciation in {lang}": {"ru": "Практика произношения ({lang})", "hu": "Kiejtés gyakorlása ({lang})"},
     "Quiz Empty": {"ru": "Тест пуст", "hu": "A teszt üres"},
     "Quiz Finished": {"ru": "Тест окончен", "hu": "Teszt befejezve"},
@@ -120,26 +148,40 @@ TRANSLATIONS = {
     "Retry Phase": {"ru": "Работа над ошибками", "hu": "Javító kör"},
     "Retry phase complete! Well done.": {"ru": "Работа над ошибками завершена! Молодец.", "hu": "A javító kör kész! Szép munka."},
     "Review Complete": {"ru": "Повторение завершено", "hu": "Kikérdezés kész"},
+    "Run &Maintenance": {"ru": "&Обслуживание базы", "hu": "Adatbázis &karbantartása"},
+    "Running database maintenance...": {"ru": "Обслуживание базы данных...", "hu": "Adatbázis karbantartása..."},
     "Save Database Export": {"ru": "Сохранить экспорт", "hu": "Exportálás mentése"},
+    "Save Deck Package": {"ru": "Сохранить пакет колоды", "hu": "Pakli csomag mentése"},
+    "Search &Online": {"ru": "Искать &онлайн", "hu": "Keresés &online"},
+    "Searching your dictionaries...": {"ru": "Поиск в ваших словарях...", "hu": "Keresés a szótáraidban..."},
     "Select Dictionary": {"ru": "Выбор словаря", "hu": "Szótár kiválasztása"},
     "Settings": {"ru": "Настройки", "hu": "Beállítások"},
     "Settings have been saved. A restart is required to apply all changes.\n\nRestart now?": {"ru": "Настройки сохранены. Для применения всех изменений требуется перезапуск.\n\nПерезапустить сейчас?", "hu": "A beállítások mentve. A változtatások érvényesítéséhez újraindítás szükséges.\n\nÚjraindítja most?"},
     "Show Answer": {"ru": "Показать ответ", "hu": "Válasz mutatása"},
+    "Skipped {count} notes with an empty front or back, such as image- or audio-only cards.": {"ru": "Пропущено заметок с пустой лицевой или оборотной стороной (например, карточки только с картинкой или звуком): {count}.", "hu": "{count} jegyzet kimaradt, mert az eleje vagy a hátoldala üres (például csak képet vagy hangot tartalmazó kártyák)."},
     "Speak": {"ru": "Озвучить", "hu": "Kiejtés"},
     "Speak Learned Word": {"ru": "Озвучить слово", "hu": "Szó kiejtése"},
     "Speak Text": {"ru": "Озвучить текст", "hu": "Szöveg felolvasása"},
     "Speak Translation": {"ru": "Озвучить перевод", "hu": "Fordítás kiejtése"},
+    "Statistics": {"ru": "Статистика", "hu": "Statisztika"},
+    "Successfully exported {count} words and {audio} audio files.": {"ru": "Успешно экспортировано слов: {count}, аудиофайлов: {audio}.", "hu": "Sikeresen exportálva: {count} szó és {audio} hangfájl."},
     "Successfully exported {count} words.": {"ru": "Успешно экспортировано {count} слов.", "hu": "Sikeresen exportálva: {count} szó."},
+    "Successfully imported {count} words and {audio} new audio files.": {"ru": "Успешно импортировано слов: {count}, новых аудиофайлов: {audio}.", "hu": "Sikeresen importálva: {count} szó és {audio} új hangfájl."},
     "Successfully imported {count} words.": {"ru": "Успешно импортировано {count} слов.", "hu": "Sikeresen importálva: {count} szó."},
     "The answer is:\n\n{answer}": {"ru": "Ответ:\n\n{answer}", "hu": "A helyes válasz:\n\n{answer}"},
+    "The database integrity check found problems:\n\n{errors}": {"ru": "Проверка целостности базы данных обнаружила проблемы:\n\n{errors}", "hu": "Az adatbázis ellenőrzése problémákat talált:\n\n{errors}"},
+    "There are no dictionaries to export.": {"ru": "Нет словарей для экспорта.", "hu": "Nincs exportálható szótár."},
     "To:": {"ru": "На язык:", "hu": "Erre:"},
+    "Too many requests are in progress. Please try again in a moment.": {"ru": "Выполняется слишком много запросов. Повторите попытку чуть позже.", "hu": "Túl sok kérés van folyamatban. Kérlek, próbáld újra egy kicsit később."},
     "Translate": {"ru": "Перевести", "hu": "Fordítás"},
     "Translate To:": {"ru": "Перевести на:", "hu": "Fordítás erre:"}, # NEW
     "Translate the following:": {"ru": "Переведите:", "hu": "Fordítsd le a következőt:"},
     "Translating '{word}' from {source} to {target}...": {"ru": "Перевод «{word}» с {source} на {target}...", "hu": "Fordítás: '{word}' ({source} -> {target})..."},
     "Translating {word}...": {"ru": "Перевод {word}...", "hu": "Fordítás: {word}..." },
     "Translation complete.": {"ru": "Перевод завершен.", "hu": "Fordítás kész."},
-    "You must create at least one dictionary before adding words.": {"ru": "Сначала создайте хотя бы один словарь.", "hu": "Mielőtt szavakat adnál hozzá, hozz létre egy szótárat."}
+    "Use \"Search Online\" to also ask the online translator.": {"ru": "Нажмите «Искать онлайн», чтобы также спросить онлайн-переводчик.", "hu": "A \"Keresés online\" gombbal az online fordítót is megkérdezheted."},
+    "You must create at least one dictionary before adding words.": {"ru": "Сначала создайте хотя бы один словарь.", "hu": "Mielőtt szavakat adnál hozzá, hozz létre egy szótárat."},
+    "{name} ({due} due / {total} words)": {"ru": "{name} ({due} к повторению / {total} слов)", "hu": "{name} ({due} esedékes / {total} szó)"},
 }
 
 def set_language(lang_code='en'):
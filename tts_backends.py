@@ -0,0 +1,144 @@
+# tts_backends.py
+# Text-to-Speech engines for Powerlang: online gTTS plus local engines (pyttsx3, eSpeak NG),
+# picked per language by availability and measured latency.
+# Run `python tts_backends.py <lang_code>` to compare the latency of all installed engines.
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+
+try: from gtts import gTTS, gTTSError
+except ImportError: gTTS, gTTSError = None, None
+try: import pyttsx3
+except ImportError: pyttsx3 = None
+
+NETWORK_TIMEOUT = 5 # Seconds before a gTTS request counts as failed
+SLOW_NETWORK_SECONDS = 2.0 # Average gTTS latency above which local engines are tried first
+OFFLINE_RETRY_SECONDS = 60 # How long to skip online engines after a network failure
+BENCHMARK_TEXTS = ["Hello", "Good morning, how are you today?", "This is a slightly longer sentence used to compare how fast each engine can produce speech."]
+
+class TTSBackend:
+    """
+    Base class for TTS engines. `synthesize` writes an audio file for `text` to `path`.
+    `network_errors` are the exceptions that mean an online engine could not be reached.
+    """
+    name, extension, online, network_errors = None, 'mp3', False, ()
+    def is_available(self): return True
+    def supports(self, lang_code): return True
+    def synthesize(self, text, lang_code, path): raise NotImplementedError
+
+class GTTSBackend(TTSBackend):
+    name, extension, online = 'gtts', 'mp3', True
+    # requests' exceptions are OSErrors; gTTSError covers HTTP failures. A ValueError (unsupported language) is not one.
+    network_errors = (OSError,) + ((gTTSError,) if gTTSError else ())
+    def is_available(self): return gTTS is not None
+    def synthesize(self, text, lang_code, path): gTTS(text=text, lang=lang_code, slow=False, timeout=NETWORK_TIMEOUT).save(path)
+
+class EspeakBackend(TTSBackend):
+    name, extension = 'espeak', 'wav'
+    voice_names = {'zh-CN': 'cmn', 'no': 'nb'} # Powerlang codes that eSpeak NG names differently
+    def __init__(self):
+        self.executable = shutil.which('espeak-ng') or shutil.which('espeak')
+        self.voices = None
+    def is_available(self): return self.executable is not None
+    def voice(self, lang_code): return self.voice_names.get(lang_code, lang_code)
+    def supports(self, lang_code):
+        if self.voices is None:
+            try: output = subprocess.run([self.executable, '--voices'], capture_output=True, text=True, timeout=10).stdout
+            except (OSError, subprocess.SubprocessError): output = ""
+            # Columns: Pty Language Age/Gender VoiceName File Other...
+            self.voices = {line.split()[1] for line in output.splitlines()[1:] if len(line.split()) > 1}
+        voice = self.voice(lang_code)
+        return any(name == voice or name.startswith(voice + '-') for name in self.voices)
+    def synthesize(self, text, lang_code, path):
+        # The text goes through stdin so words like "-ing" are not read as options.
+        subprocess.run([self.executable, '-v', self.voice(lang_code), '-w', path, '--stdin'], input=text.encode('utf-8'), check=True, capture_output=True, timeout=30)
+
+class Pyttsx3Backend(TTSBackend):
+    name, extension = 'pyttsx3', 'wav'
+    def __init__(self):
+        self.lock = threading.Lock() # pyttsx3 engines are not thread-safe
+        self.voices = {} # lang_code: voice id, or None if there is no voice for it
+    def is_available(self): return pyttsx3 is not None
+    def find_voice(self, engine, lang_code):
+        base = lang_code.split('-')[0].lower()
+        for voice in engine.getProperty('voices'):
+            languages = [lang.decode('utf-8', 'ignore') if isinstance(lang, bytes) else str(lang) for lang in (voice.languages or [])]
+            # SAPI voices usually leave `languages` empty but carry the locale in their id, e.g. ...TTS_MS_EN-US_ZIRA_11.0
+            if any(lang.lstrip('\x05').lower().split('-')[0].split('_')[0] == base for lang in languages) or f"_{base.upper()}-" in voice.id.upper():
+                return voice.id
+        return None
+    def supports(self, lang_code):
+        with self.lock:
+            if lang_code not in self.voices:
+                try: self.voices[lang_code] = self.find_voice(pyttsx3.init(), lang_code)
+                except Exception: self.voices[lang_code] = None
+            return self.voices[lang_code] is not None
+    def synthesize(self, text, lang_code, path):
+        with self.lock:
+            engine = pyttsx3.init()
+            engine.setProperty('voice', self.voices[lang_code])
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+        if not os.path.exists(path): raise RuntimeError(f"pyttsx3 produced no audio for '{text}'")
+
+BACKENDS = [GTTSBackend(), Pyttsx3Backend(), EspeakBackend()]
+
+latency = {} # (backend name, lang_code): moving average of synthesis time in seconds
+offline_until = 0.0
+
+def backends_for(lang_code):
+    """
+    Returns the usable backends for a language, best first. Online engines come first while
+    the network is healthy, and drop to the end when they are slow or skipped entirely
+    for a while after a failure. Local engines are ordered by their measured latency.
+    """
+    network_down = time.monotonic() < offline_until
+    candidates = [b for b in BACKENDS if b.is_available() and not (b.online and network_down) and b.supports(lang_code)]
+    def rank(backend):
+        measured = latency.get((backend.name, lang_code))
+        degraded = backend.online and measured is not None and measured > SLOW_NETWORK_SECONDS
+        return (degraded, not backend.online, measured if measured is not None else 0.0)
+    return sorted(candidates, key=rank)
+
+def synthesize_with(backend, text, lang_code, path):
+    """Runs one backend, recording its latency and marking the network down if an online engine cannot be reached."""
+    global offline_until
+    start = time.perf_counter()
+    try: backend.synthesize(text, lang_code, path)
+    except backend.network_errors:
+        if backend.online: offline_until = time.monotonic() + OFFLINE_RETRY_SECONDS
+        raise
+    elapsed, key = time.perf_counter() - start, (backend.name, lang_code)
+    latency[key] = elapsed if key not in latency else 0.7 * latency[key] + 0.3 * elapsed
+
+def benchmark(lang_code, texts=BENCHMARK_TEXTS, rounds=3):
+    """Times every installed backend on the same texts. Returns {backend name: [seconds, ...] or error message}."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in BACKENDS:
+            if not backend.is_available(): results[backend.name] = "not installed"; continue
+            if not backend.supports(lang_code): results[backend.name] = f"no voice for '{lang_code}'"; continue
+            timings = []
+            try:
+                for round_number in range(rounds):
+                    for index, text in enumerate(texts):
+                        start = time.perf_counter()
+                        backend.synthesize(text, lang_code, os.path.join(tmp, f"{backend.name}_{round_number}_{index}.{backend.extension}"))
+                        timings.append(time.perf_counter() - start)
+                results[backend.name] = timings
+            except Exception as e: results[backend.name] = f"failed: {e}"
+    return results
+
+if __name__ == '__main__':
+    lang_code = sys.argv[1] if len(sys.argv) > 1 else 'en'
+    print(f"TTS latency for '{lang_code}' ({len(BENCHMARK_TEXTS)} texts x 3 rounds):")
+    print(f"{'Engine':<10}{'Median':>10}{'Min':>10}{'Max':>10}")
+    for name, timings in benchmark(lang_code).items():
+        if isinstance(timings, str): print(f"{name:<10}  {timings}"); continue
+        timings = sorted(timings)
+        print(f"{name:<10}{timings[len(timings) // 2] * 1000:>8.0f}ms{timings[0] * 1000:>8.0f}ms{timings[-1] * 1000:>8.0f}ms")
@@ -1,11 +1,13 @@
 # tts_handler.py
-# Handles all Text-to-Speech operations using gTTS and playsound.
+# Handles all Text-to-Speech operations: caching and playback, with synthesis done by tts_backends.
 
-from gtts import gTTS
 from playsound import playsound
 import os
+import re
 import threading
 import hashlib
+import background
+import tts_backends
 
 # Import the settings from the main app to check the cache setting
 from powerlang import app_settings
@@ -14,12 +16,64 @@ CACHE_DIR = "tts_cache"
 if not os.path.exists(CACHE_DIR):
     os.makedirs(CACHE_DIR)
 
+MIN_SEGMENT_CHARS = 20 # Shorter pieces are joined with the next one rather than synthesized on their own
+
 sound_lock = threading.Lock()
+# Possible sentence ends: after sentence-ending punctuation or at line breaks. CJK full stops need no following space.
+sentence_end_re = re.compile(r'(?<=[。！？])\s*|(?<=[.!?…؟])\s+|\n+')
+
+def split_sentences(text):
+    segments = []
+    for piece in sentence_end_re.split(text):
+        piece = piece.strip()
+        if not piece: continue
+        # A lowercase start means the full stop was an abbreviation ("e.g. this"); a very short piece is
+        # usually one too ("Dr. Smith"), and either way is not worth a request and a pause of its own.
+        if segments and (piece[0].islower() or len(segments[-1]) < MIN_SEGMENT_CHARS):
+            segments[-1] += ("" if segments[-1][-1] in "。！？" else " ") + piece
+        else: segments.append(piece)
+    return segments
+
+def cache_path(text, lang_code, backend):
+    # gTTS files keep the original '<lang>_<md5>.mp3' names; other engines get their own prefix.
+    hashed_name = hashlib.md5(text.encode('utf-8')).hexdigest()
+    prefix = "" if backend.name == 'gtts' else f"{backend.name}_"
+    return os.path.join(CACHE_DIR, f"{prefix}{lang_code}_{hashed_name}.{backend.extension}")
+
+def synthesize(text, lang_code):
+    """
+    Returns the path of the audio file for `text`. Any engine's cached copy is used as-is, even if that
+    engine is not installed or currently offline (audio from deck packages, for example); otherwise
+    the engines are tried in the order tts_backends ranks them until one succeeds.
+    """
+    for backend in tts_backends.BACKENDS:
+        if os.path.exists(filepath := cache_path(text, lang_code, backend)): return filepath
+    backends = tts_backends.backends_for(lang_code)
+    if not backends: raise RuntimeError(f"No text-to-speech engine is available for '{lang_code}'.")
+    last_error = None
+    for backend in backends:
+        filepath = cache_path(text, lang_code, backend)
+        print(f"Generating new TTS file for '{text}' ({lang_code}, {backend.name})...")
+        # Save under a temporary name so an interrupted download never ends up in the cache.
+        partial = filepath + ".part"
+        try: tts_backends.synthesize_with(backend, text, lang_code, partial)
+        except Exception as e:
+            print(f"TTS engine {backend.name} failed, trying the next one: {e}")
+            if os.path.exists(partial): os.remove(partial)
+            last_error = e
+            continue
+        os.replace(partial, filepath)
+        return filepath
+    raise last_error
 
-def speak(text, lang_code, keep_cache):
+def speak(text, lang_code, keep_cache, token=None):
     """
     Generates and plays audio for the given text and language.
-    Deletes the file after playing if the cache setting is disabled.
+    Longer text is split into sentences that are synthesized concurrently and played in order
+    as soon as each is ready, so playback starts after the first sentence rather than the whole text.
+    Each sentence is cached on its own. Playback stops before the next sentence once `token`
+    (a background.CancelToken) is cancelled. If the cache setting is disabled, every file synthesized
+    for the text is deleted afterwards, including sentences that were never played or finish after a cancel.
     """
     if not text or not lang_code:
         print("TTS Error: No text to speak.")
@@ -30,28 +84,38 @@ def speak(text, lang_code, keep_cache):
         print("Audio is already playing. New request ignored.")
         return
 
-    filepath = None
+    # Repeated sentences share one synthesis job and one cache file.
+    jobs = {}
     try:
         with sound_lock:
-            hashed_name = hashlib.md5(text.encode('utf-8')).hexdigest()
-            filename = f"{lang_code}_{hashed_name}.mp3"
-            filepath = os.path.join(CACHE_DIR, filename)
-
-            if not os.path.exists(filepath):
-                print(f"Generating new TTS file for '{text}' ({lang_code})...")
-                tts = gTTS(text=text, lang=lang_code, slow=False)
-                tts.save(filepath)
-            
-            print(f"Playing TTS: {filepath}")
-            playsound(filepath, block=True)
+            segments = split_sentences(text) or [text]
+            for segment in segments:
+                if segment not in jobs: jobs[segment] = background.submit('tts', synthesize, segment, lang_code, token=token)
+            for segment in segments:
+                if token is not None and token.cancelled:
+                    for job in jobs.values():
+                        if job: job.cancel()
+                    break
+                # None means the job failed (already logged) or the pool is shutting down.
+                filepath = jobs[segment].result() if jobs[segment] else None
+                if not filepath: continue
+                print(f"Playing TTS: {filepath}")
+                playsound(filepath, block=True)
             
     except Exception as e:
         print(f"An error occurred in the TTS handler: {e}")
     
     finally:
-        if filepath and os.path.exists(filepath) and not keep_cache:
-            try:
-                os.remove(filepath)
-                print(f"Deleted cached file: {filepath}")
-            except Exception as e:
-                print(f"Error deleting cached file {filepath}: {e}")
\ No newline at end of file
+        if not keep_cache:
+            # Runs right away for finished jobs, and when a job still in progress completes.
+            for job in jobs.values():
+                if job: job.add_done_callback(_delete_result)
+
+def _delete_result(job):
+    filepath = None if job.cancelled() else job.result()
+    if filepath and os.path.exists(filepath):
+        try:
+            os.remove(filepath)
+            print(f"Deleted cached file: {filepath}")
+        except Exception as e:
+            print(f"Error deleting cached file {filepath}: {e}")